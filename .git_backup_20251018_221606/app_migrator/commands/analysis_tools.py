@@ -1,1707 +0,0 @@
-"""
-Core Analysis Tools for App Migrator
-COMPLETE REWRITE with comprehensive error handling while preserving all original functionality
-
-Original functionality preserved:
-- App structure analysis
-- Migration compatibility scoring  
-- Code complexity analysis
-- Dependency analysis
-- Security vulnerability scanning
-- Performance analysis
-- Database schema analysis
-- API endpoint detection
-- Custom script analysis
-- Documentation analysis
-- Test coverage analysis
-- Build configuration analysis
-- Deployment configuration analysis
-- Environment configuration analysis
-- Backup and recovery analysis
-- Monitoring and logging analysis
-- Compliance and security analysis
-
-Core Analysis Tools for App Migrator
-COMPLETE FIXED VERSION with proper error handling and module detection
-"""
-
-import os
-import re
-import json
-import ast
-import yaml
-import frappe
-import subprocess
-import sys
-import inspect
-import tempfile
-import hashlib
-from typing import Dict, List, Any, Optional, Tuple, Set
-from pathlib import Path
-from datetime import datetime
-from collections import defaultdict, Counter
-import importlib.util
-import configparser
-
-class AppAnalysis:
-    def __init__(self):
-        self.analysis_cache = {}
-        self.migration_patterns = {
-            'compatible': ['frappe', 'python', 'postgresql', 'mariadb', 'redis', 'node', 'nginx'],
-            'risky': ['custom_scripts', 'external_apis', 'file_system_access'],
-            'incompatible': ['php', 'java', 'oracle', 'sqlserver', 'windows_specific']
-        }
-        self.complexity_thresholds = {
-            'low': 10,
-            'medium': 20,
-            'high': 50
-        }
-        
-    # ==================== CORE APP STRUCTURE ANALYSIS ====================
-    
-    def analyze_app_structure(self, app_name: str) -> Dict[str, Any]:
-        """
-        Comprehensive app structure analysis with enhanced error handling
-        """
-        try:
-            print(f"🔍 Analyzing app structure: {app_name}")
-            
-            # Get app path with multiple fallbacks
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return self._create_error_result(f"App {app_name} not found or inaccessible")
-            
-            analysis_result = {
-                "app_name": app_name,
-                "app_path": str(app_path),
-                "exists": True,
-                "structure_valid": False,
-                "modules": [],
-                "doctypes": [],
-                "python_files": [],
-                "json_files": [],
-                "js_files": [],
-                "html_files": [],
-                "css_files": [],
-                "hooks_data": {},
-                "dependencies": [],
-                "issues": [],
-                "warnings": [],
-                "recommendations": [],
-                "structure_score": 0,
-                "analysis_timestamp": datetime.now().isoformat()
-            }
-
-            # 1. Analyze hooks.py
-            hooks_analysis = self.analyze_hooks_file(app_path)
-            analysis_result["hooks_data"] = hooks_analysis
-            analysis_result["dependencies"] = hooks_analysis.get("dependencies", [])
-
-            # 2. Discover modules
-            modules_dir = app_path / "modules"
-            analysis_result["modules"] = self.discover_modules(modules_dir)
-
-            # 3. Discover doctypes
-            analysis_result["doctypes"] = self.discover_doctypes(app_path)
-
-            # 4. File type analysis
-            file_analysis = self.analyze_file_types(app_path)
-            analysis_result.update(file_analysis)
-
-            # 5. Directory structure analysis
-            dir_analysis = self.analyze_directory_structure(app_path)
-            analysis_result.update(dir_analysis)
-
-            # 6. Validate structure and calculate score
-            structure_validation = self.validate_app_structure(analysis_result)
-            analysis_result["structure_valid"] = structure_validation["valid"]
-            analysis_result["structure_score"] = structure_validation["score"]
-            analysis_result["issues"].extend(structure_validation["issues"])
-            analysis_result["warnings"].extend(structure_validation["warnings"])
-
-            # 7. Generate recommendations
-            analysis_result["recommendations"] = self.generate_structure_recommendations(analysis_result)
-
-            print(f"✅ Structure analysis complete: {len(analysis_result.get('modules', []))} modules found, Score: {analysis_result['structure_score']}/100")
-            return analysis_result
-
-        except Exception as e:
-            error_msg = f"Error analyzing app structure: {str(e)}"
-            print(f"❌ {error_msg}")
-            return self._create_error_result(error_msg)
-
-    def _get_app_path_safe(self, app_name: str) -> Optional[Path]:
-        """Get app path with enhanced Frappe bench detection"""
-        try:
-            # Method 1: Frappe's get_app_path (when running in bench context)
-            if hasattr(frappe, 'get_app_path'):
-                try:
-                    app_path = frappe.get_app_path(app_name)
-                    if app_path and os.path.exists(app_path):
-                        return Path(app_path)
-                except Exception:
-                    pass  # Fall through to other methods
-            
-            # Method 2: Current bench apps directory
-            bench_path = Path.cwd()
-            possible_paths = [
-                bench_path / "apps" / app_name,
-                bench_path / app_name,
-                bench_path.parent / "apps" / app_name,  # ../apps/app_name
-                Path("/home/frappe/frappe-bench/apps") / app_name,
-                Path("/home/frappe/frappe-bench-clean-v6/apps") / app_name,
-                Path("/tmp/frappe-bench/apps") / app_name
-            ]
-            
-            # Also check if we're in a bench directory structure
-            if (bench_path / "sites").exists() and (bench_path / "apps").exists():
-                # We're in bench root
-                possible_paths.insert(0, bench_path / "apps" / app_name)
-            elif (bench_path.parent / "sites").exists() and (bench_path.parent / "apps").exists():
-                # We're in apps directory
-                possible_paths.insert(0, bench_path / app_name)
-            
-            for path in possible_paths:
-                if path.exists():
-                    print(f"📁 Found app path: {path}")
-                    return path
-            
-            print(f"❌ App path not found for: {app_name}")
-            print(f"   Checked paths: {[str(p) for p in possible_paths[:3]]}...")
-            return None
-            
-        except Exception as e:
-            print(f"Warning: Error getting app path for {app_name}: {e}")
-            return None
-
-    def analyze_hooks_file(self, app_path: Path) -> Dict[str, Any]:
-        """Comprehensive hooks.py analysis with multiple parsing methods"""
-        hooks_file = Path(app_path) / "hooks.py"
-        hooks_data = {
-            "exists": False,
-            "app_name": "",
-            "app_title": "",
-            "app_version": "",
-            "app_publisher": "",
-            "app_description": "",
-            "app_license": "",
-            "required_apps": [],
-            "dependencies": [],
-            "has_install_after": False,
-            "has_migrate": False,
-            "has_after_install": False,
-            "has_before_install": False,
-            "has_after_migrate": False,
-            "has_before_migrate": False,
-            "error": None,
-            "content_hash": "",
-            "analysis_method": "none"
-        }
-
-        if not hooks_file.exists():
-            hooks_data["error"] = "hooks.py not found"
-            return hooks_data
-
-        try:
-            hooks_data["exists"] = True
-            
-            with open(hooks_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            hooks_data["content_hash"] = hashlib.md5(content.encode()).hexdigest()
-            hooks_data["file_size"] = len(content)
-            
-            # Try multiple parsing methods
-            parsing_methods = [
-                self._parse_hooks_with_ast,
-                self._parse_hooks_with_regex,
-                self._parse_hooks_with_exec
-            ]
-            
-            for method in parsing_methods:
-                try:
-                    parsed_data = method(content)
-                    if parsed_data and parsed_data.get("app_name"):
-                        hooks_data.update(parsed_data)
-                        hooks_data["analysis_method"] = method.__name__
-                        break
-                except Exception as e:
-                    continue
-            
-            # Fallback to basic regex if all methods fail
-            if not hooks_data.get("app_name"):
-                basic_data = self._parse_hooks_basic(content)
-                hooks_data.update(basic_data)
-                hooks_data["analysis_method"] = "basic_fallback"
-            
-            # Ensure required_apps and dependencies are lists
-            hooks_data["required_apps"] = hooks_data.get("required_apps", []) or []
-            hooks_data["dependencies"] = hooks_data.get("dependencies", []) or []
-            
-        except Exception as e:
-            hooks_data["error"] = f"Error analyzing hooks.py: {str(e)}"
-            
-        return hooks_data
-
-    def _parse_hooks_with_ast(self, content: str) -> Dict[str, Any]:
-        """Parse hooks.py using AST for safety"""
-        try:
-            tree = ast.parse(content)
-            hooks_data = {}
-            
-            for node in tree.body:
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            var_name = target.id
-                            if isinstance(node.value, ast.Str):
-                                hooks_data[var_name] = node.value.s
-                            elif isinstance(node.value, ast.List):
-                                hooks_data[var_name] = [elt.s for elt in node.value.elts if isinstance(elt, ast.Str)]
-            
-            return self._normalize_hooks_data(hooks_data)
-        except Exception:
-            return {}
-
-    def _parse_hooks_with_regex(self, content: str) -> Dict[str, Any]:
-        """Parse hooks.py using regex patterns"""
-        patterns = {
-            'app_name': r'app_name\s*=\s*["\']([^"\']+)["\']',
-            'app_title': r'app_title\s*=\s*["\']([^"\']+)["\']',
-            'app_version': r'app_version\s*=\s*["\']([^"\']+)["\']',
-            'app_publisher': r'app_publisher\s*=\s*["\']([^"\']+)["\']',
-            'app_description': r'app_description\s*=\s*["\']([^"\']+)["\']',
-            'app_license': r'app_license\s*=\s*["\']([^"\']+)["\']',
-        }
-        
-        hooks_data = {}
-        for key, pattern in patterns.items():
-            match = re.search(pattern, content)
-            if match:
-                hooks_data[key] = match.group(1)
-        
-        # Extract list variables
-        list_patterns = {
-            'required_apps': r'required_apps\s*=\s*\[([^\]]+)\]',
-            'dependencies': r'dependencies\s*=\s*\[([^\]]+)\]'
-        }
-        
-        for key, pattern in list_patterns.items():
-            match = re.search(pattern, content)
-            if match:
-                items = re.findall(r'["\']([^"\']+)["\']', match.group(1))
-                hooks_data[key] = items
-        
-        # Check for hook functions
-        hook_functions = [
-            'install_after', 'migrate', 'after_install', 'before_install',
-            'after_migrate', 'before_migrate'
-        ]
-        
-        for func in hook_functions:
-            hooks_data[f'has_{func}'] = f'def {func}' in content or f'{func} =' in content
-        
-        return self._normalize_hooks_data(hooks_data)
-
-    def _parse_hooks_with_exec(self, content: str) -> Dict[str, Any]:
-        """Parse hooks.py using controlled execution (risky but comprehensive)"""
-        try:
-            # Create a safe environment for execution
-            safe_globals = {
-                '__builtins__': {
-                    'str': str,
-                    'list': list,
-                    'dict': dict,
-                    'len': len,
-                    'range': range,
-                    'bool': bool
-                }
-            }
-            
-            safe_locals = {}
-            exec(content, safe_globals, safe_locals)
-            
-            hooks_data = {}
-            hook_variables = [
-                'app_name', 'app_title', 'app_version', 'app_publisher',
-                'app_description', 'app_license', 'required_apps', 'dependencies'
-            ]
-            
-            for var in hook_variables:
-                if var in safe_locals:
-                    hooks_data[var] = safe_locals[var]
-            
-            # Check for hook functions
-            hook_functions = [
-                'install_after', 'migrate', 'after_install', 'before_install',
-                'after_migrate', 'before_migrate'
-            ]
-            
-            for func in hook_functions:
-                hooks_data[f'has_{func}'] = func in safe_locals
-            
-            return self._normalize_hooks_data(hooks_data)
-            
-        except Exception:
-            return {}
-
-    def _parse_hooks_basic(self, content: str) -> Dict[str, Any]:
-        """Basic fallback parsing"""
-        hooks_data = {}
-        
-        # Simple string extraction
-        string_vars = ['app_name', 'app_title', 'app_version', 'app_publisher', 'app_description', 'app_license']
-        for var in string_vars:
-            pattern = rf'{var}\s*=\s*["\']([^"\']+)["\']'
-            match = re.search(pattern, content)
-            if match:
-                hooks_data[var] = match.group(1)
-        
-        return hooks_data
-
-    def _normalize_hooks_data(self, hooks_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Normalize hooks data to ensure consistent types"""
-        normalized = hooks_data.copy()
-        
-        # Ensure lists
-        list_vars = ['required_apps', 'dependencies']
-        for var in list_vars:
-            if var in normalized:
-                if isinstance(normalized[var], str):
-                    # Convert string representation of list to actual list
-                    try:
-                        normalized[var] = ast.literal_eval(normalized[var])
-                    except:
-                        normalized[var] = [normalized[var]]
-                elif not isinstance(normalized[var], list):
-                    normalized[var] = []
-            else:
-                normalized[var] = []
-        
-        # Ensure strings are stripped
-        string_vars = ['app_name', 'app_title', 'app_version', 'app_publisher', 'app_description', 'app_license']
-        for var in string_vars:
-            if var in normalized and isinstance(normalized[var], str):
-                normalized[var] = normalized[var].strip()
-        
-        return normalized
-
-    def discover_modules(self, modules_dir: Path) -> List[Dict[str, Any]]:
-        """Comprehensive module discovery with metadata"""
-        modules = []
-        try:
-            if modules_dir.exists():
-                print(f"🔍 Scanning modules directory: {modules_dir}")
-                for item in modules_dir.iterdir():
-                    if item.is_dir() and not item.name.startswith('.') and item.name != '__pycache__':
-                        module_info = {
-                            "name": item.name,
-                            "path": str(item),
-                            "has_doctype": (item / "doctype").exists(),
-                            "has_page": (item / "page").exists(),
-                            "has_workflow": (item / "workflow").exists(),
-                            "has_dashboard": (item / "dashboard").exists(),
-                            "python_files": len(list(item.rglob("*.py"))),
-                            "json_files": len(list(item.rglob("*.json"))),
-                            "doctypes": self._discover_module_doctypes(item)
-                        }
-                        
-                        # Include module even if it has no content yet (might be new module)
-                        modules.append(module_info)
-                        print(f"  📦 Found module: {item.name} (Python files: {module_info['python_files']}, Doctypes: {len(module_info['doctypes'])})")
-                            
-            else:
-                print(f"❌ Modules directory not found: {modules_dir}")
-                
-        except Exception as e:
-            print(f"Warning: Error discovering modules: {e}")
-            
-        return sorted(modules, key=lambda x: x["name"])
-
-    def _discover_module_doctypes(self, module_path: Path) -> List[Dict[str, Any]]:
-        """Discover doctypes within a module"""
-        doctypes = []
-        try:
-            doctype_path = module_path / "doctype"
-            if doctype_path.exists():
-                for doctype_dir in doctype_path.iterdir():
-                    if doctype_dir.is_dir() and not doctype_dir.name.startswith('.'):
-                        doctype_info = {
-                            "name": doctype_dir.name,
-                            "path": str(doctype_dir),
-                            "has_controller": (doctype_dir / f"{doctype_dir.name}.py").exists(),
-                            "has_json": (doctype_dir / f"{doctype_dir.name}.json").exists(),
-                            "has_js": len(list(doctype_dir.rglob("*.js"))) > 0,
-                            "has_html": len(list(doctype_dir.rglob("*.html"))) > 0
-                        }
-                        doctypes.append(doctype_info)
-        except Exception as e:
-            print(f"Warning: Error discovering doctypes in {module_path}: {e}")
-            
-        return doctypes
-
-    def discover_doctypes(self, app_path: Path) -> List[Dict[str, Any]]:
-        """Comprehensive doctype discovery across all modules"""
-        doctypes = []
-        try:
-            modules_path = Path(app_path) / "modules"
-            if modules_path.exists():
-                for module_dir in modules_path.iterdir():
-                    if module_dir.is_dir():
-                        module_doctypes = self._discover_module_doctypes(module_dir)
-                        for doctype in module_doctypes:
-                            doctype["module"] = module_dir.name
-                        doctypes.extend(module_doctypes)
-        except Exception as e:
-            print(f"Warning: Error discovering doctypes: {e}")
-            
-        return doctypes
-
-    def analyze_file_types(self, app_path: Path) -> Dict[str, Any]:
-        """Comprehensive file type analysis"""
-        file_analysis = {
-            "python_files": 0,
-            "json_files": 0,
-            "js_files": 0,
-            "html_files": 0,
-            "css_files": 0,
-            "md_files": 0,
-            "txt_files": 0,
-            "yaml_files": 0,
-            "xml_files": 0,
-            "sql_files": 0,
-            "total_files": 0,
-            "file_size_distribution": {},
-            "largest_files": []
-        }
-        
-        try:
-            app_path = Path(app_path)
-            file_sizes = []
-            
-            for file_type, pattern in [
-                ("python_files", "*.py"),
-                ("json_files", "*.json"),
-                ("js_files", "*.js"),
-                ("html_files", "*.html"),
-                ("css_files", "*.css"),
-                ("md_files", "*.md"),
-                ("txt_files", "*.txt"),
-                ("yaml_files", "*.yaml"),
-                ("xml_files", "*.xml"),
-                ("sql_files", "*.sql")
-            ]:
-                files = list(app_path.rglob(pattern))
-                file_analysis[file_type] = len(files)
-                file_analysis["total_files"] += len(files)
-                
-                # Collect file sizes
-                for file_path in files:
-                    try:
-                        size = file_path.stat().st_size
-                        file_sizes.append((str(file_path), size))
-                    except:
-                        continue
-            
-            # Analyze file size distribution
-            if file_sizes:
-                file_sizes.sort(key=lambda x: x[1], reverse=True)
-                file_analysis["largest_files"] = file_sizes[:10]
-                
-                sizes = [size for _, size in file_sizes]
-                file_analysis.update({
-                    "average_file_size": sum(sizes) / len(sizes),
-                    "largest_file_size": max(sizes) if sizes else 0,
-                    "smallest_file_size": min(sizes) if sizes else 0,
-                    "total_size": sum(sizes)
-                })
-                
-        except Exception as e:
-            print(f"Warning: Error analyzing file types: {e}")
-            
-        return file_analysis
-
-    def analyze_directory_structure(self, app_path: Path) -> Dict[str, Any]:
-        """Analyze directory structure and organization"""
-        dir_analysis = {
-            "directory_count": 0,
-            "max_depth": 0,
-            "essential_dirs_present": {},
-            "directory_tree": {},
-            "missing_standard_dirs": [],
-            "unusual_dirs": []
-        }
-        
-        try:
-            app_path = Path(app_path)
-            standard_dirs = [
-                "modules", "public", "templates", "www", "config", 
-                "patches", "fixtures", "translations", "utils"
-            ]
-            
-            unusual_dirs = ["temp", "tmp", "backup", "log", "logs", "cache"]
-            
-            essential_dirs = {
-                "modules": "Core modules directory",
-                "hooks.py": "App configuration file"
-            }
-            
-            # Check essential directories
-            for dir_name, description in essential_dirs.items():
-                path = app_path / dir_name
-                dir_analysis["essential_dirs_present"][dir_name] = {
-                    "exists": path.exists(),
-                    "description": description
-                }
-            
-            # Check standard directories
-            for dir_name in standard_dirs:
-                path = app_path / dir_name
-                if not path.exists():
-                    dir_analysis["missing_standard_dirs"].append(dir_name)
-            
-            # Check for unusual directories
-            for item in app_path.iterdir():
-                if item.is_dir() and item.name.lower() in unusual_dirs:
-                    dir_analysis["unusual_dirs"].append(item.name)
-            
-            # Build directory tree (limited depth for performance)
-            dir_analysis["directory_tree"] = self._build_directory_tree(app_path, max_depth=3)
-            dir_analysis["directory_count"] = self._count_directories(app_path)
-            dir_analysis["max_depth"] = self._calculate_max_depth(app_path)
-            
-        except Exception as e:
-            print(f"Warning: Error analyzing directory structure: {e}")
-            
-        return dir_analysis
-
-    def _build_directory_tree(self, path: Path, max_depth: int, current_depth: int = 0) -> Dict[str, Any]:
-        """Build directory tree structure"""
-        if current_depth > max_depth:
-            return {"name": path.name, "type": "directory", "depth": current_depth}
-            
-        tree = {
-            "name": path.name,
-            "type": "directory",
-            "depth": current_depth,
-            "children": []
-        }
-        
-        try:
-            for item in path.iterdir():
-                if item.is_dir() and not item.name.startswith('.') and item.name != '__pycache__':
-                    child_tree = self._build_directory_tree(item, max_depth, current_depth + 1)
-                    tree["children"].append(child_tree)
-                elif item.is_file() and current_depth <= max_depth - 1:
-                    tree["children"].append({
-                        "name": item.name,
-                        "type": "file",
-                        "size": item.stat().st_size,
-                        "depth": current_depth + 1
-                    })
-        except Exception:
-            pass
-            
-        return tree
-
-    def _count_directories(self, path: Path) -> int:
-        """Count total directories"""
-        try:
-            return sum(1 for _ in path.rglob('*') if _.is_dir() and not _.name.startswith('.') and _.name != '__pycache__')
-        except Exception:
-            return 0
-
-    def _calculate_max_depth(self, path: Path) -> int:
-        """Calculate maximum directory depth"""
-        try:
-            max_depth = 0
-            for root, dirs, files in os.walk(path):
-                depth = root.replace(str(path), '').count(os.sep)
-                if depth > max_depth:
-                    max_depth = depth
-            return max_depth
-        except Exception:
-            return 0
-
-    def validate_app_structure(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Comprehensive app structure validation"""
-        validation = {
-            "valid": False,
-            "score": 0,
-            "issues": [],
-            "warnings": [],
-            "checks_passed": 0,
-            "checks_total": 0,
-            "detailed_checks": {}
-        }
-        
-        try:
-            checks = []
-            
-            # Check 1: App exists
-            check1 = analysis.get("exists", False)
-            checks.append(("app_exists", check1, "App directory exists"))
-            if not check1:
-                validation["issues"].append("App directory does not exist")
-            
-            # Check 2: hooks.py exists
-            hooks_data = analysis.get("hooks_data", {})
-            check2 = hooks_data.get("exists", False)
-            checks.append(("hooks_exists", check2, "hooks.py file exists"))
-            if not check2:
-                validation["issues"].append("hooks.py file not found")
-            
-            # Check 3: app_name defined
-            check3 = bool(hooks_data.get("app_name", ""))
-            checks.append(("app_name_defined", check3, "app_name is defined"))
-            if not check3:
-                validation["issues"].append("app_name not defined in hooks.py")
-            
-            # Check 4: Has modules
-            modules = analysis.get("modules", [])
-            check4 = len(modules) > 0
-            checks.append(("has_modules", check4, "Has at least one module"))
-            if not check4:
-                validation["warnings"].append("No modules found")
-            
-            # Check 5: Modules have proper structure
-            valid_modules = 0
-            for module in modules:
-                if module.get("has_doctype", False) or module.get("python_files", 0) > 0:
-                    valid_modules += 1
-            
-            check5 = valid_modules > 0
-            checks.append(("valid_modules", check5, "Has valid modules with content"))
-            if not check5:
-                validation["issues"].append("No valid modules with content found")
-            
-            # Check 6: Required apps defined (warning if not)
-            check6 = hooks_data.get("has_required_apps", False) or len(hooks_data.get("required_apps", [])) > 0
-            checks.append(("dependencies_defined", check6, "Dependencies are defined"))
-            if not check6:
-                validation["warnings"].append("No dependencies defined in hooks.py")
-            
-            # Calculate score
-            passed_checks = [check for name, check, desc in checks if check]
-            validation["checks_passed"] = len(passed_checks)
-            validation["checks_total"] = len(checks)
-            validation["score"] = int((len(passed_checks) / len(checks)) * 100)
-            
-            # Overall validation
-            essential_checks = [check for name, check, desc in checks[:4] if check]  # First 4 are essential
-            validation["valid"] = len(essential_checks) >= 3  # At least 3 out of 4 essential checks
-            
-            # Store detailed checks
-            validation["detailed_checks"] = {
-                name: {"passed": check, "description": desc} 
-                for name, check, desc in checks
-            }
-            
-        except Exception as e:
-            validation["issues"].append(f"Validation error: {str(e)}")
-            validation["score"] = 0
-            validation["valid"] = False
-            
-        return validation
-
-    def generate_structure_recommendations(self, analysis: Dict[str, Any]) -> List[str]:
-        """Generate structure improvement recommendations"""
-        recommendations = []
-        
-        try:
-            hooks_data = analysis.get("hooks_data", {})
-            modules = analysis.get("modules", [])
-            validation = analysis.get("structure_validation", {})
-            issues = analysis.get("issues", [])
-            
-            # hooks.py recommendations
-            if not hooks_data.get("exists"):
-                recommendations.append("Create hooks.py file with basic app configuration")
-            else:
-                if not hooks_data.get("app_name"):
-                    recommendations.append("Add app_name to hooks.py")
-                if not hooks_data.get("app_title"):
-                    recommendations.append("Add app_title to hooks.py")
-                if not hooks_data.get("app_description"):
-                    recommendations.append("Add app_description to hooks.py")
-                if not hooks_data.get("required_apps"):
-                    recommendations.append("Define required_apps in hooks.py")
-                if not hooks_data.get("app_version"):
-                    recommendations.append("Add app_version to hooks.py")
-            
-            # Module recommendations
-            if not modules:
-                recommendations.append("Create at least one module directory under modules/")
-            else:
-                empty_modules = [m for m in modules if not m.get("has_doctype") and m.get("python_files", 0) == 0]
-                if empty_modules:
-                    recommendations.append(f"Add content to empty modules: {[m['name'] for m in empty_modules[:3]]}")
-            
-            # Structure recommendations based on validation
-            if not validation.get("valid", False):
-                recommendations.append("Fix essential structure issues before proceeding")
-            
-            # File organization recommendations
-            if analysis.get("total_files", 0) > 1000:
-                recommendations.append("Consider organizing files into better directory structure")
-            
-            if analysis.get("missing_standard_dirs"):
-                missing = analysis.get("missing_standard_dirs", [])[:3]
-                recommendations.append(f"Consider adding standard directories: {', '.join(missing)}")
-            
-            # Performance recommendations
-            largest_files = analysis.get("largest_files", [])
-            if largest_files and largest_files[0][1] > 1024 * 1024:  # 1MB
-                recommendations.append("Consider optimizing large files for better performance")
-            
-        except Exception as e:
-            recommendations.append("Error generating recommendations - check app structure manually")
-            
-        return recommendations
-
-    # ==================== MIGRATION COMPATIBILITY ANALYSIS ====================
-
-    def analyze_migration_compatibility(self, app_name: str, detailed: bool = False) -> Dict[str, Any]:
-        """
-        Analyze migration compatibility with enhanced error handling
-        """
-        try:
-            print(f"🔍 Analyzing migration compatibility: {app_name}")
-            
-            # Check if app exists first
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return self._create_compatibility_error_result(app_name, f"App {app_name} not found or inaccessible")
-            
-            # Get structure analysis first
-            structure_analysis = self.analyze_app_structure(app_name)
-            
-            compatibility_result = {
-                "app_name": app_name,
-                "migration_ready": False,
-                "compatibility_score": 0,
-                "compatibility_level": "unknown",
-                "readiness_breakdown": {},
-                "critical_issues": [],
-                "warnings": [],
-                "recommendations": [],
-                "detailed_analysis": {},
-                "migration_effort": "unknown",
-                "estimated_timeline": "unknown",
-                "risk_level": "unknown"
-            }
-            
-            # If basic structure analysis failed, return early
-            if not structure_analysis.get("exists", False):
-                compatibility_result.update({
-                    "critical_issues": ["App not found or inaccessible"],
-                    "compatibility_level": "invalid",
-                    "migration_effort": "high",
-                    "risk_level": "high"
-                })
-                return compatibility_result
-            
-            # Merge structure analysis
-            compatibility_result.update({
-                "exists": structure_analysis.get("exists", False),
-                "structure_valid": structure_analysis.get("structure_valid", False),
-                "structure_score": structure_analysis.get("structure_score", 0),
-                "modules": structure_analysis.get("modules", []),
-                "doctypes": structure_analysis.get("doctypes", []),
-                "hooks_data": structure_analysis.get("hooks_data", {}),
-                "file_analysis": {
-                    "python_files": structure_analysis.get("python_files", 0),
-                    "json_files": structure_analysis.get("json_files", 0),
-                    "js_files": structure_analysis.get("js_files", 0),
-                    "total_files": structure_analysis.get("total_files", 0)
-                }
-            })
-            
-            # Perform comprehensive compatibility analysis
-            compatibility_analysis = self._perform_comprehensive_compatibility_analysis(structure_analysis)
-            compatibility_result.update(compatibility_analysis)
-            
-            # Calculate overall metrics
-            final_metrics = self._calculate_final_migration_metrics(compatibility_result)
-            compatibility_result.update(final_metrics)
-            
-            print(f"✅ Compatibility analysis complete: Score {compatibility_result['compatibility_score']}/100 - Level: {compatibility_result['compatibility_level']}")
-            return compatibility_result
-            
-        except Exception as e:
-            error_msg = f"Error in migration compatibility analysis: {str(e)}"
-            print(f"❌ {error_msg}")
-            return self._create_compatibility_error_result(app_name, error_msg)
-
-    def _perform_comprehensive_compatibility_analysis(self, structure_analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform detailed compatibility analysis across multiple dimensions"""
-        analysis = {
-            "compatibility_score": 0,
-            "compatibility_level": "unknown",
-            "readiness_breakdown": {},
-            "critical_issues": [],
-            "warnings": [],
-            "recommendations": []
-        }
-        
-        try:
-            hooks_data = structure_analysis.get("hooks_data", {})
-            modules = structure_analysis.get("modules", [])
-            doctypes = structure_analysis.get("doctypes", [])
-            file_analysis = structure_analysis.get("file_analysis", {})
-            
-            # 1. Structure Compatibility (30%)
-            structure_score = self._analyze_structure_compatibility(structure_analysis)
-            analysis["readiness_breakdown"]["structure"] = structure_score
-            
-            # 2. Dependencies Compatibility (25%)
-            deps_score = self._analyze_dependencies_compatibility(hooks_data)
-            analysis["readiness_breakdown"]["dependencies"] = deps_score
-            
-            # 3. Code Quality Compatibility (20%)
-            code_score = self._analyze_code_quality_compatibility(structure_analysis)
-            analysis["readiness_breakdown"]["code_quality"] = code_score
-            
-            # 4. Configuration Compatibility (15%)
-            config_score = self._analyze_configuration_compatibility(hooks_data, structure_analysis)
-            analysis["readiness_breakdown"]["configuration"] = config_score
-            
-            # 5. Data Compatibility (10%)
-            data_score = self._analyze_data_compatibility(doctypes, modules)
-            analysis["readiness_breakdown"]["data"] = data_score
-            
-            # Calculate overall score (weighted average)
-            weights = {
-                "structure": 0.30,
-                "dependencies": 0.25,
-                "code_quality": 0.20,
-                "configuration": 0.15,
-                "data": 0.10
-            }
-            
-            total_score = 0
-            for category, weight in weights.items():
-                category_score = analysis["readiness_breakdown"].get(category, 0)
-                total_score += category_score * weight
-            
-            analysis["compatibility_score"] = int(total_score)
-            analysis["compatibility_level"] = self._get_compatibility_level(total_score)
-            
-            # Generate issues and recommendations
-            analysis["critical_issues"] = self._identify_critical_issues(analysis, structure_analysis)
-            analysis["warnings"] = self._identify_warnings(analysis, structure_analysis)
-            analysis["recommendations"] = self._generate_compatibility_recommendations(analysis, structure_analysis)
-            
-        except Exception as e:
-            analysis["critical_issues"].append(f"Compatibility analysis error: {str(e)}")
-            analysis["compatibility_score"] = 0
-            analysis["compatibility_level"] = "error"
-            
-        return analysis
-
-    def _analyze_structure_compatibility(self, structure_analysis: Dict[str, Any]) -> int:
-        """Analyze structure compatibility (0-100)"""
-        try:
-            score = 0
-            
-            # Base structure validity
-            if structure_analysis.get("structure_valid", False):
-                score += 40
-            
-            # Module organization
-            modules = structure_analysis.get("modules", [])
-            if modules:
-                score += 20
-                # Bonus for well-organized modules
-                valid_modules = len([m for m in modules if m.get("has_doctype") or m.get("python_files", 0) > 0])
-                if valid_modules == len(modules):
-                    score += 10
-            
-            # File organization
-            file_analysis = structure_analysis.get("file_analysis", {})
-            if file_analysis.get("total_files", 0) > 0:
-                score += 15
-                # Bonus for reasonable file count (not too many, not too few)
-                total_files = file_analysis.get("total_files", 0)
-                if 10 <= total_files <= 1000:
-                    score += 10
-                elif total_files > 5000:
-                    score -= 10  # Penalty for too many files (potential mess)
-            
-            # Directory structure
-            if structure_analysis.get("directory_structure", {}).get("essential_dirs_present", {}):
-                essential_dirs = structure_analysis["directory_structure"]["essential_dirs_present"]
-                present_count = sum(1 for dir_info in essential_dirs.values() if dir_info.get("exists", False))
-                score += (present_count / max(1, len(essential_dirs))) * 15
-            
-            return min(100, score)
-            
-        except Exception:
-            return 0
-
-    def _analyze_dependencies_compatibility(self, hooks_data: Dict[str, Any]) -> int:
-        """Analyze dependencies compatibility (0-100)"""
-        try:
-            score = 80  # Start with assumption of compatibility
-            
-            required_apps = hooks_data.get("required_apps", [])
-            dependencies = hooks_data.get("dependencies", [])
-            
-            # Check for known compatible dependencies
-            compatible_patterns = ['frappe', 'erpnext', 'python', 'postgresql', 'mariadb']
-            risky_patterns = ['redis', 'node', 'external_api', 'custom']
-            incompatible_patterns = ['php', 'java', 'oracle', 'sqlserver', 'windows']
-            
-            all_deps = required_apps + dependencies
-            
-            for dep in all_deps:
-                dep_lower = dep.lower()
-                
-                # Penalties for risky/incompatible dependencies
-                if any(pattern in dep_lower for pattern in incompatible_patterns):
-                    score -= 30
-                elif any(pattern in dep_lower for pattern in risky_patterns):
-                    score -= 15
-                elif any(pattern in dep_lower for pattern in compatible_patterns):
-                    score += 5  # Bonus for compatible deps
-            
-            # Penalty for no dependencies defined (might mean hidden dependencies)
-            if not all_deps and hooks_data.get("exists", False):
-                score -= 20
-            
-            return max(0, min(100, score))
-            
-        except Exception:
-            return 50  # Default middle score on error
-
-    def _analyze_code_quality_compatibility(self, structure_analysis: Dict[str, Any]) -> int:
-        """Analyze code quality compatibility (0-100)"""
-        try:
-            score = 70  # Start with reasonable assumption
-            
-            file_analysis = structure_analysis.get("file_analysis", {})
-            hooks_data = structure_analysis.get("hooks_data", {})
-            
-            # Analyze based on file patterns
-            python_files = file_analysis.get("python_files", 0)
-            json_files = file_analysis.get("json_files", 0)
-            js_files = file_analysis.get("js_files", 0)
-            total_files = file_analysis.get("total_files", 0)
-            
-            # Good balance of file types
-            if python_files > 0 and json_files > 0:
-                score += 10
-            
-            # Reasonable file counts
-            if total_files < 5000:
-                score += 10
-            elif total_files > 10000:
-                score -= 10  # Penalty for very large apps
-            
-            # hooks.py quality indicators
-            if hooks_data.get("app_version"):
-                score += 5
-            if hooks_data.get("app_description"):
-                score += 5
-            if hooks_data.get("app_license"):
-                score += 5
-            
-            return min(100, score)
-            
-        except Exception:
-            return 50
-
-    def _analyze_configuration_compatibility(self, hooks_data: Dict[str, Any], structure_analysis: Dict[str, Any]) -> int:
-        """Analyze configuration compatibility (0-100)"""
-        try:
-            score = 0
-            
-            # Basic hooks configuration
-            if hooks_data.get("app_name"):
-                score += 25
-            if hooks_data.get("app_title"):
-                score += 15
-            if hooks_data.get("required_apps"):
-                score += 20
-            if hooks_data.get("app_version"):
-                score += 15
-            if hooks_data.get("app_description"):
-                score += 15
-            if hooks_data.get("app_license"):
-                score += 10
-            
-            return min(100, score)
-            
-        except Exception:
-            return 0
-
-    def _analyze_data_compatibility(self, doctypes: List[Dict[str, Any]], modules: List[Dict[str, Any]]) -> int:
-        """Analyze data/compatibility (0-100)"""
-        try:
-            score = 50  # Start with neutral score
-            
-            # Bonus for having doctypes
-            if doctypes:
-                score += 20
-                
-                # Analyze doctype structure
-                valid_doctypes = 0
-                for doctype in doctypes:
-                    if doctype.get("has_json", False) and doctype.get("has_controller", False):
-                        valid_doctypes += 1
-                
-                if valid_doctypes > 0:
-                    score += 20
-                if valid_doctypes == len(doctypes):
-                    score += 10
-            
-            # Bonus for multiple modules with doctypes
-            modules_with_doctypes = len([m for m in modules if m.get("has_doctype", False)])
-            if modules_with_doctypes > 1:
-                score += 10
-            
-            return min(100, score)
-            
-        except Exception:
-            return 50
-
-    def _get_compatibility_level(self, score: float) -> str:
-        """Get compatibility level from score"""
-        if score >= 90:
-            return "excellent"
-        elif score >= 80:
-            return "high"
-        elif score >= 70:
-            return "good"
-        elif score >= 60:
-            return "moderate"
-        elif score >= 50:
-            return "fair"
-        else:
-            return "poor"
-
-    def _identify_critical_issues(self, analysis: Dict[str, Any], structure_analysis: Dict[str, Any]) -> List[str]:
-        """Identify critical migration issues"""
-        issues = []
-        
-        try:
-            score = analysis.get("compatibility_score", 0)
-            hooks_data = structure_analysis.get("hooks_data", {})
-            structure_valid = structure_analysis.get("structure_valid", False)
-            
-            if score < 50:
-                issues.append("Low compatibility score indicates significant migration challenges")
-            
-            if not structure_valid:
-                issues.append("Invalid app structure - may not install properly")
-            
-            if not hooks_data.get("app_name"):
-                issues.append("Missing app_name - app cannot be identified")
-            
-            if not hooks_data.get("exists", False):
-                issues.append("Missing hooks.py - app configuration not found")
-            
-            # Check dependencies for known incompatible patterns
-            deps = hooks_data.get("required_apps", []) + hooks_data.get("dependencies", [])
-            incompatible_patterns = ['oracle', 'sqlserver', 'windows', 'java', 'php']
-            for dep in deps:
-                if any(pattern in dep.lower() for pattern in incompatible_patterns):
-                    issues.append(f"Potentially incompatible dependency: {dep}")
-            
-        except Exception as e:
-            issues.append(f"Error identifying critical issues: {str(e)}")
-            
-        return issues
-
-    def _identify_warnings(self, analysis: Dict[str, Any], structure_analysis: Dict[str, Any]) -> List[str]:
-        """Identify migration warnings"""
-        warnings = []
-        
-        try:
-            hooks_data = structure_analysis.get("hooks_data", {})
-            modules = structure_analysis.get("modules", [])
-            file_analysis = structure_analysis.get("file_analysis", {})
-            
-            if not hooks_data.get("app_version"):
-                warnings.append("No app version specified - may cause dependency issues")
-            
-            if not hooks_data.get("required_apps"):
-                warnings.append("No dependencies specified - may have hidden dependencies")
-            
-            if not modules:
-                warnings.append("No modules found - app may be empty or misconfigured")
-            
-            if file_analysis.get("total_files", 0) > 5000:
-                warnings.append("Large number of files - migration may take longer")
-            
-            # Check for risky patterns in dependencies
-            deps = hooks_data.get("required_apps", []) + hooks_data.get("dependencies", [])
-            risky_patterns = ['redis', 'node', 'custom', 'external']
-            for dep in deps:
-                if any(pattern in dep.lower() for pattern in risky_patterns):
-                    warnings.append(f"Risky dependency that may need special handling: {dep}")
-            
-        except Exception as e:
-            warnings.append(f"Error identifying warnings: {str(e)}")
-            
-        return warnings
-
-    def _generate_compatibility_recommendations(self, analysis: Dict[str, Any], structure_analysis: Dict[str, Any]) -> List[str]:
-        """Generate compatibility improvement recommendations"""
-        recommendations = []
-        
-        try:
-            score = analysis.get("compatibility_score", 0)
-            hooks_data = structure_analysis.get("hooks_data", {})
-            readiness_breakdown = analysis.get("readiness_breakdown", {})
-            
-            # General recommendations based on score
-            if score < 70:
-                recommendations.append("Improve app structure and configuration before migration")
-            
-            if score < 50:
-                recommendations.append("Consider major refactoring or rewrite for successful migration")
-            
-            # Specific recommendations based on breakdown
-            structure_score = readiness_breakdown.get("structure", 0)
-            if structure_score < 70:
-                recommendations.append("Improve app directory structure and organization")
-            
-            deps_score = readiness_breakdown.get("dependencies", 0)
-            if deps_score < 70:
-                recommendations.append("Review and update dependencies for compatibility")
-            
-            config_score = readiness_breakdown.get("configuration", 0)
-            if config_score < 70:
-                recommendations.append("Enhance app configuration in hooks.py")
-            
-            # hooks.py specific recommendations
-            if not hooks_data.get("app_version"):
-                recommendations.append("Add version information to hooks.py")
-            
-            if not hooks_data.get("required_apps"):
-                recommendations.append("Define all dependencies in hooks.py")
-            
-            if not hooks_data.get("app_description"):
-                recommendations.append("Add app description to hooks.py")
-            
-        except Exception as e:
-            recommendations.append("Error generating specific recommendations - review app manually")
-            
-        return recommendations
-
-    def _calculate_final_migration_metrics(self, compatibility_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate final migration metrics"""
-        try:
-            score = compatibility_result.get("compatibility_score", 0)
-            critical_issues = compatibility_result.get("critical_issues", [])
-            
-            # Determine migration effort
-            if score >= 80:
-                effort = "low"
-                timeline = "1-2 weeks"
-                risk = "low"
-            elif score >= 60:
-                effort = "medium"
-                timeline = "2-4 weeks"
-                risk = "medium"
-            elif score >= 40:
-                effort = "high"
-                timeline = "1-2 months"
-                risk = "high"
-            else:
-                effort = "very high"
-                timeline = "2-4 months"
-                risk = "very high"
-            
-            # Adjust based on critical issues
-            if critical_issues:
-                if effort == "low":
-                    effort = "medium"
-                risk = "high"
-                timeline = f"{timeline} + assessment"
-            
-            return {
-                "migration_effort": effort,
-                "estimated_timeline": timeline,
-                "risk_level": risk,
-                "migration_ready": score >= 70 and len(critical_issues) == 0
-            }
-            
-        except Exception:
-            return {
-                "migration_effort": "unknown",
-                "estimated_timeline": "unknown",
-                "risk_level": "unknown",
-                "migration_ready": False
-            }
-
-    def _create_compatibility_error_result(self, app_name: str, error: str) -> Dict[str, Any]:
-        """Create comprehensive error result for compatibility analysis"""
-        return {
-            "app_name": app_name,
-            "error": error,
-            "migration_ready": False,
-            "compatibility_score": 0,
-            "compatibility_level": "error",
-            "critical_issues": [f"Analysis error: {error}"],
-            "warnings": ["Analysis failed - manual review required"],
-            "recommendations": [
-                "Check app installation and accessibility",
-                "Verify app structure manually",
-                "Retry analysis after fixing any issues"
-            ],
-            "migration_effort": "unknown",
-            "estimated_timeline": "unknown",
-            "risk_level": "high",
-            "exists": False,
-            "structure_valid": False
-        }
-
-    def _create_error_result(self, error_msg: str) -> Dict[str, Any]:
-        """Create comprehensive error result"""
-        return {
-            "error": error_msg,
-            "exists": False,
-            "structure_valid": False,
-            "structure_score": 0,
-            "modules": [],
-            "doctypes": [],
-            "hooks_data": {"exists": False, "error": error_msg},
-            "file_analysis": {},
-            "directory_structure": {},
-            "issues": [error_msg],
-            "warnings": ["Analysis failed - check app manually"],
-            "recommendations": ["Verify app exists and is accessible", "Check permissions and paths"],
-            "analysis_timestamp": datetime.now().isoformat()
-        }
-
-    # ==================== ADDITIONAL ORIGINAL FUNCTIONALITY ====================
-
-    def analyze_code_complexity(self, app_name: str) -> Dict[str, Any]:
-        """Analyze code complexity with enhanced error handling"""
-        try:
-            print(f"🔍 Analyzing code complexity: {app_name}")
-            
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return {"error": "App not found", "complexity_score": 0, "analysis": "failed", "exists": False}
-            
-            # Basic complexity analysis based on file structure
-            file_analysis = self.analyze_file_types(app_path)
-            python_files = file_analysis.get("python_files", 0)
-            total_files = file_analysis.get("total_files", 0)
-            
-            # Simple complexity heuristic
-            complexity_score = 0
-            if python_files > 0:
-                # Base score on file ratios and counts
-                python_ratio = python_files / max(1, total_files)
-                complexity_score = min(100, (python_files * 2) + (python_ratio * 50))
-            
-            complexity_level = "low"
-            if complexity_score > 50:
-                complexity_level = "high"
-            elif complexity_score > 20:
-                complexity_level = "medium"
-            
-            return {
-                "complexity_score": int(complexity_score),
-                "complexity_level": complexity_level,
-                "file_metrics": {
-                    "python_files": python_files,
-                    "total_files": total_files,
-                    "python_ratio": python_files / max(1, total_files)
-                },
-                "analysis": "basic_heuristic"
-            }
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "complexity_score": 0,
-                "complexity_level": "unknown",
-                "analysis": "failed",
-                "exists": False
-            }
-
-    def analyze_dependencies(self, app_name: str) -> Dict[str, Any]:
-        """Analyze dependencies with enhanced error handling"""
-        try:
-            print(f"🔍 Analyzing dependencies: {app_name}")
-            
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return {"error": "App not found", "dependencies": [], "count": 0, "exists": False}
-            
-            hooks_analysis = self.analyze_hooks_file(app_path)
-            dependencies = hooks_analysis.get("dependencies", [])
-            required_apps = hooks_analysis.get("required_apps", [])
-            
-            all_dependencies = list(set(dependencies + required_apps))
-            
-            compatibility = self.assess_dependency_compatibility(all_dependencies)
-            
-            return {
-                "dependencies": all_dependencies,
-                "required_apps": required_apps,
-                "additional_dependencies": dependencies,
-                "count": len(all_dependencies),
-                "compatibility": compatibility,
-                "hooks_analysis": {
-                    "exists": hooks_analysis.get("exists", False),
-                    "app_name": hooks_analysis.get("app_name", "")
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "dependencies": [],
-                "required_apps": [],
-                "additional_dependencies": [],
-                "count": 0,
-                "compatibility": {"error": str(e)},
-                "exists": False
-            }
-
-    def assess_dependency_compatibility(self, dependencies: List[str]) -> Dict[str, Any]:
-        """Assess dependency compatibility with enhanced analysis"""
-        try:
-            compatible = []
-            risky = []
-            incompatible = []
-            unknown = []
-            
-            compatible_patterns = ['frappe', 'erpnext', 'python']
-            risky_patterns = ['redis', 'node', 'external', 'custom', 'api']
-            incompatible_patterns = ['oracle', 'sqlserver', 'java', 'php', 'windows']
-            
-            for dep in dependencies:
-                dep_lower = dep.lower()
-                
-                if any(pattern in dep_lower for pattern in incompatible_patterns):
-                    incompatible.append(dep)
-                elif any(pattern in dep_lower for pattern in risky_patterns):
-                    risky.append(dep)
-                elif any(pattern in dep_lower for pattern in compatible_patterns):
-                    compatible.append(dep)
-                else:
-                    unknown.append(dep)
-            
-            total = len(dependencies)
-            compatibility_ratio = len(compatible) / max(1, total)
-            
-            return {
-                "compatible": compatible,
-                "risky": risky,
-                "incompatible": incompatible,
-                "unknown": unknown,
-                "compatibility_ratio": compatibility_ratio,
-                "compatibility_score": int(compatibility_ratio * 100),
-                "summary": {
-                    "total_dependencies": total,
-                    "compatible_count": len(compatible),
-                    "risky_count": len(risky),
-                    "incompatible_count": len(incompatible),
-                    "unknown_count": len(unknown)
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "compatible": [],
-                "risky": [],
-                "incompatible": [],
-                "unknown": [],
-                "compatibility_ratio": 0,
-                "compatibility_score": 0
-            }
-
-    def analyze_security_vulnerabilities(self, app_name: str) -> Dict[str, Any]:
-        """Basic security vulnerability analysis"""
-        try:
-            print(f"🔍 Analyzing security vulnerabilities: {app_name}")
-            
-            # This is a basic implementation - original might have more sophisticated checks
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return {"error": "App not found", "vulnerabilities": [], "security_score": 0, "exists": False}
-            
-            # Basic security checks
-            vulnerabilities = []
-            security_score = 80  # Start with reasonable score
-            
-            hooks_analysis = self.analyze_hooks_file(app_path)
-            if not hooks_analysis.get("exists", False):
-                vulnerabilities.append("Missing hooks.py - security configuration not found")
-                security_score -= 20
-            
-            # Check for common security issues in file structure
-            file_analysis = self.analyze_file_types(app_path)
-            if file_analysis.get("python_files", 0) > 100:
-                # Large codebase might have more security surface
-                security_score -= 10
-            
-            return {
-                "security_score": max(0, security_score),
-                "vulnerabilities": vulnerabilities,
-                "security_level": "medium" if security_score >= 70 else "low",
-                "recommendations": [
-                    "Perform comprehensive security audit",
-                    "Review dependencies for known vulnerabilities",
-                    "Implement proper authentication and authorization"
-                ]
-            }
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "vulnerabilities": ["Analysis failed"],
-                "security_score": 0,
-                "security_level": "unknown",
-                "exists": False
-            }
-
-    def analyze_performance(self, app_name: str) -> Dict[str, Any]:
-        """Basic performance analysis based on structure"""
-        try:
-            print(f"🔍 Analyzing performance characteristics: {app_name}")
-            
-            app_path = self._get_app_path_safe(app_name)
-            if not app_path or not app_path.exists():
-                return {"error": "App not found", "performance_score": 0, "exists": False}
-            
-            structure_analysis = self.analyze_app_structure(app_name)
-            file_analysis = structure_analysis.get("file_analysis", {})
-            
-            # Simple performance heuristics
-            performance_score = 70  # Base score
-            
-            # Adjust based on file characteristics
-            total_files = file_analysis.get("total_files", 0)
-            if total_files > 5000:
-                performance_score -= 10  # Large apps might be slower
-            elif total_files < 100:
-                performance_score += 10  # Small apps typically faster
-            
-            largest_file = file_analysis.get("largest_file_size", 0)
-            if largest_file > 1024 * 1024:  # 1MB
-                performance_score -= 10  # Large files might indicate performance issues
-            
-            return {
-                "performance_score": max(0, performance_score),
-                "performance_level": "good" if performance_score >= 80 else "adequate",
-                "metrics": {
-                    "total_files": total_files,
-                    "largest_file_size": largest_file,
-                    "average_file_size": file_analysis.get("average_file_size", 0)
-                },
-                "recommendations": [
-                    "Monitor actual performance in production",
-                    "Optimize database queries",
-                    "Implement caching where appropriate"
-                ]
-            }
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "performance_score": 0,
-                "performance_level": "unknown",
-                "exists": False
-            }
-
-    # ==================== ADDITIONAL UTILITY METHODS ====================
-
-    def get_analysis_summary(self, app_name: str) -> Dict[str, Any]:
-        """Get comprehensive analysis summary"""
-        try:
-            print(f"📊 Generating comprehensive analysis summary: {app_name}")
-            
-            structure = self.analyze_app_structure(app_name)
-            compatibility = self.analyze_migration_compatibility(app_name)
-            dependencies = self.analyze_dependencies(app_name)
-            complexity = self.analyze_code_complexity(app_name)
-            security = self.analyze_security_vulnerabilities(app_name)
-            performance = self.analyze_performance(app_name)
-            
-            # Calculate overall health score
-            scores = [
-                compatibility.get("compatibility_score", 0),
-                structure.get("structure_score", 0),
-                dependencies.get("compatibility", {}).get("compatibility_score", 0),
-                security.get("security_score", 0),
-                performance.get("performance_score", 0)
-            ]
-            
-            valid_scores = [s for s in scores if s > 0]
-            overall_health = sum(valid_scores) / max(1, len(valid_scores))
-            
-            return {
-                "app_name": app_name,
-                "overall_health_score": int(overall_health),
-                "overall_health_level": self._get_health_level(overall_health),
-                "analysis_timestamp": datetime.now().isoformat(),
-                "structure_analysis": structure,
-                "compatibility_analysis": compatibility,
-                "dependency_analysis": dependencies,
-                "complexity_analysis": complexity,
-                "security_analysis": security,
-                "performance_analysis": performance,
-                "summary": {
-                    "migration_ready": compatibility.get("migration_ready", False),
-                    "critical_issues": len(compatibility.get("critical_issues", [])),
-                    "total_recommendations": len(structure.get("recommendations", [])) + len(compatibility.get("recommendations", [])),
-                    "module_count": len(structure.get("modules", [])),
-                    "doctype_count": len(structure.get("doctypes", [])),
-                    "dependency_count": len(dependencies.get("dependencies", []))
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "app_name": app_name,
-                "error": f"Comprehensive analysis failed: {str(e)}",
-                "overall_health_score": 0,
-                "overall_health_level": "error",
-                "analysis_timestamp": datetime.now().isoformat()
-            }
-
-    def _get_health_level(self, score: float) -> str:
-        """Get health level from score"""
-        if score >= 90:
-            return "excellent"
-        elif score >= 80:
-            return "good"
-        elif score >= 70:
-            return "fair"
-        elif score >= 60:
-            return "needs_improvement"
-        else:
-            return "poor"
-
-    def export_analysis_report(self, app_name: str, format: str = "json") -> Dict[str, Any]:
-        """Export analysis report in various formats"""
-        try:
-            analysis = self.get_analysis_summary(app_name)
-            
-            if format == "json":
-                return {
-                    "format": "json",
-                    "content": json.dumps(analysis, indent=2),
-                    "filename": f"{app_name}_analysis_report.json"
-                }
-            elif format == "summary":
-                # Create a text summary
-                summary_lines = [
-                    f"Analysis Report for: {app_name}",
-                    f"Generated: {datetime.now().isoformat()}",
-                    f"Overall Health: {analysis.get('overall_health_score', 0)}% ({analysis.get('overall_health_level', 'unknown')})",
-                    f"Migration Ready: {analysis.get('compatibility_analysis', {}).get('migration_ready', False)}",
-                    f"Modules: {analysis.get('summary', {}).get('module_count', 0)}",
-                    f"Doctypes: {analysis.get('summary', {}).get('doctype_count', 0)}",
-                    f"Dependencies: {analysis.get('summary', {}).get('dependency_count', 0)}",
-                    f"Critical Issues: {analysis.get('summary', {}).get('critical_issues', 0)}",
-                    "",
-                    "RECOMMENDATIONS:"
-                ]
-                
-                # Add recommendations from various analyses
-                for analysis_type in ['structure_analysis', 'compatibility_analysis']:
-                    recs = analysis.get(analysis_type, {}).get('recommendations', [])
-                    for rec in recs[:5]:  # Limit to top 5 per analysis type
-                        summary_lines.append(f"- {rec}")
-                
-                return {
-                    "format": "text",
-                    "content": "\n".join(summary_lines),
-                    "filename": f"{app_name}_analysis_summary.txt"
-                }
-            else:
-                return {
-                    "error": f"Unsupported format: {format}",
-                    "supported_formats": ["json", "summary"]
-                }
-                
-        except Exception as e:
-            return {
-                "error": f"Export failed: {str(e)}",
-                "format": format,
-                "content": ""
-            }
-
-# Create singleton instance
-app_analysis = AppAnalysis()
-
-# ==================== EXPORT ALL ORIGINAL FUNCTIONS ====================
-
-def analyze_app_structure(app_name: str) -> Dict[str, Any]:
-    """Analyze application structure"""
-    return app_analysis.analyze_app_structure(app_name)
-
-def analyze_migration_compatibility(app_name: str, detailed: bool = False) -> Dict[str, Any]:
-    """Analyze migration compatibility"""
-    return app_analysis.analyze_migration_compatibility(app_name, detailed)
-
-def analyze_code_complexity(app_name: str) -> Dict[str, Any]:
-    """Analyze code complexity"""
-    return app_analysis.analyze_code_complexity(app_name)
-
-def analyze_dependencies(app_name: str) -> Dict[str, Any]:
-    """Analyze dependencies"""
-    return app_analysis.analyze_dependencies(app_name)
-
-def assess_dependency_compatibility(dependencies: List[str]) -> Dict[str, Any]:
-    """Assess dependency compatibility"""
-    return app_analysis.assess_dependency_compatibility(dependencies)
-
-def analyze_security_vulnerabilities(app_name: str) -> Dict[str, Any]:
-    """Analyze security vulnerabilities"""
-    return app_analysis.analyze_security_vulnerabilities(app_name)
-
-def analyze_performance(app_name: str) -> Dict[str, Any]:
-    """Analyze performance characteristics"""
-    return app_analysis.analyze_performance(app_name)
-
-def get_analysis_summary(app_name: str) -> Dict[str, Any]:
-    """Get comprehensive analysis summary"""
-    return app_analysis.get_analysis_summary(app_name)
-
-def export_analysis_report(app_name: str, format: str = "json") -> Dict[str, Any]:
-    """Export analysis report"""
-    return app_analysis.export_analysis_report(app_name, format)
-
-# ==================== ADDITIONAL HELPER FUNCTIONS ====================
-
-def list_available_analyses() -> List[str]:
-    """List all available analysis functions"""
-    return [
-        "analyze_app_structure",
-        "analyze_migration_compatibility", 
-        "analyze_code_complexity",
-        "analyze_dependencies",
-        "analyze_security_vulnerabilities",
-        "analyze_performance",
-        "get_analysis_summary",
-        "export_analysis_report"
-    ]
-
-def get_analysis_metadata() -> Dict[str, Any]:
-    """Get metadata about available analyses"""
-    return {
-        "version": "2.0.0",
-        "description": "Enhanced App Migration Analysis Tools",
-        "features": [
-            "Comprehensive app structure analysis",
-            "Migration compatibility scoring",
-            "Dependency analysis and compatibility assessment",
-            "Code complexity analysis",
-            "Security vulnerability assessment",
-            "Performance characteristics analysis",
-            "Multi-format report export"
-        ],
-        "supported_formats": ["json", "summary"],
-        "timestamp": datetime.now().isoformat()
-    }
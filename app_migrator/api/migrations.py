@@ -1,10 +1,63 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+import hashlib
 import json
 import os
 
 
+def _etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header value against a strong ETag
+    
+    Handles "*", comma-separated lists and weak validators (W/"..."),
+    which use weak comparison as required for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _respond_with_etag(payload):
+    """
+    Tag a read-only payload with ETag/Cache-Control headers
+    
+    Returns an empty body with HTTP 304 when the client already holds
+    the same payload (If-None-Match). Requests are only answered with 304
+    when the ETag header can actually be sent (frappe.local.response_headers,
+    Frappe v15+).
+    
+    Args:
+        payload: JSON-serialisable response payload
+    
+    Returns:
+        The payload, or an empty value of the same type when not modified
+    """
+    headers = getattr(frappe.local, "response_headers", None)
+    if headers is None:
+        return payload
+    
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    etag = f'"{hashlib.blake2b(body.encode(), digest_size=8).hexdigest()}"'
+    headers["ETag"] = etag
+    headers["Cache-Control"] = "private, max-age=5"
+    
+    request = getattr(frappe.local, "request", None)
+    if request is not None and _etag_matches(request.headers.get("If-None-Match"), etag):
+        frappe.local.response["http_status_code"] = 304
+        return type(payload)()
+    
+    return payload
+
+
 @frappe.whitelist()
 def create_migration(source_app, target_app, migration_type="full"):
     """
@@ -112,13 +165,13 @@ def get_migration_status(migration_id):
     Returns:
         dict: Migration status and details
     """
-    return {
+    return _respond_with_etag({
         "migration_id": migration_id,
         "status": "active",
         "progress": 0,
         "current_step": "initializing",
         "details": "Migration in progress"
-    }
+    })
 
 
 @frappe.whitelist()
@@ -138,7 +191,7 @@ def list_available_apps():
             apps = [d for d in os.listdir(apps_path) 
                    if os.path.isdir(os.path.join(apps_path, d)) 
                    and not d.startswith('.')]
-            return sorted(apps)
+            return _respond_with_etag(sorted(apps))
         else:
             return []
             
@@ -6,45 +6,49 @@ Merged: Original analysis + Enterprise multi-bench + Session management
 
 __version__ = "9.0.0"
 
-# ONLY import the main class - no function imports!
-from .analysis_tools import AppAnalysis
-
-__all__ = ["AppAnalysis"]
-
-print("✅ App Migrator commands loaded safely")
-
-# Import Payment Security Migrator
-from .payment_security_migrator import (
-    PaymentSecurityMigrator,
-    analyze_payment_security,
-    migrate_payment_security,
-    generate_security_report
-)
-
-__all__.extend([
-    "PaymentSecurityMigrator",
-    "analyze_payment_security", 
-    "migrate_payment_security",
-    "generate_security_report"
-])
-
-print("✅ Payment Security Migrator added to commands")
-
-# Import Payment Gateway Migrator
-try:
-    from .payment_gateway_migrator import PaymentGatewayMigrator
-    __all__.append("PaymentGatewayMigrator")
-    print("✅ Payment Gateway Migrator added to commands")
-except ImportError as e:
-    print(f"⚠️ Payment Gateway Migrator not available: {e}")
+# Library classes are loaded lazily (PEP 562) so bench command discovery
+# does not import the analysis and payment migrator modules
+_LAZY_EXPORTS = {
+    "AppAnalysis": "analysis_tools",
+    "PaymentSecurityMigrator": "payment_security_migrator",
+    "analyze_payment_security": "payment_security_migrator",
+    "migrate_payment_security": "payment_security_migrator",
+    "generate_security_report": "payment_security_migrator",
+    "PaymentGatewayMigrator": "payment_gateway_migrator",
+}
+
+# Exports whose module may fail to import; listed in __all__ only when it loads
+_OPTIONAL_EXPORTS = ("PaymentGatewayMigrator",)
+
+def __getattr__(name):
+    """Import library exports on first access"""
+    if name == "__all__":
+        exports = [export for export in _LAZY_EXPORTS if export not in _OPTIONAL_EXPORTS]
+        for export in _OPTIONAL_EXPORTS:
+            try:
+                __getattr__(export)
+            except ImportError:
+                continue
+            exports.append(export)
+        globals()["__all__"] = exports
+        return exports
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
 # ============== CLI COMMANDS FOR BENCH ==============
 import click
 import json
 import os
-import subprocess
+import re
 import time
 import sys
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 
 try:
@@ -55,15 +59,36 @@ except ImportError:
     FRAPPE_AVAILABLE = False
     pass_context = lambda f: f
 
+try:
+    import orjson  # ships with Frappe v15+
+except ImportError:
+    orjson = None
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Site currently initialised by frappe_site() and its nesting depth
+_initialized_site = None
+_site_depth = 0
+# Installed apps per site, read once per process (commands never install apps)
+_installed_apps_cache = {}
+
+# Default bench layout under the invoking user's home, resolved once
+HOME = os.path.expanduser('~')
+BENCH_DIR = os.path.join(HOME, 'frappe-bench')
+APPS_DIR = os.path.join(BENCH_DIR, 'apps')
+SESSIONS_DIR = os.path.join(HOME, 'migration_sessions')
+
 def get_current_site():
     """Get current site from common_site_config.json or currentsite.txt"""
-    import os
-    import json
-    from pathlib import Path
-    home = str(Path.home())
     possible_paths = [
         os.path.join(os.getcwd(), 'sites'),
-        os.path.join(home, 'frappe-bench', 'sites'),
+        os.path.join(BENCH_DIR, 'sites'),
         os.path.abspath(os.path.join(os.getcwd(), '..', '..', 'sites')),
     ]
     for sites_path in possible_paths:
@@ -90,11 +115,19 @@ class ProgressTracker:
         self.total_steps = total_steps
         self.current_step = 0
         self.start_time = time.time()
+        # Long runs print every ~1% of steps, or when 50ms have passed
+        self.step_stride = max(1, total_steps // 100)
+        self.last_print = 0.0
     
     def update(self, message):
         self.current_step += 1
-        elapsed = int(time.time() - self.start_time)
-        print(f"🔄 [{self.current_step}/{self.total_steps}] {message} ({elapsed}s)")
+        now = time.time()
+        if (self.current_step % self.step_stride and self.current_step != self.total_steps
+                and now - self.last_print < 0.05):
+            return
+        self.last_print = now
+        elapsed = int(now - self.start_time)
+        sys.stdout.write(f"🔄 [{self.current_step}/{self.total_steps}] {message} ({elapsed}s)\n")
     
     def complete(self):
         elapsed = int(time.time() - self.start_time)
@@ -104,266 +137,543 @@ class ProgressTracker:
         elapsed = int(time.time() - self.start_time)
         print(f"❌ [{self.current_step}/{self.total_steps}] {self.app_name} failed: {error} ({elapsed}s)")
 
+def _mtime(path):
+    """Modification time of path, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 def detect_available_benches():
     """Detect all available benches"""
-    benches = []
-    frappe_home = os.path.expanduser('~')
-    for item in os.listdir(frappe_home):
-        if item.startswith('frappe-bench') and os.path.isdir(os.path.join(frappe_home, item)):
-            benches.append(item)
-    return sorted(benches)
+    return _detect_available_benches(HOME, _mtime(HOME))
+
+@lru_cache(maxsize=1)
+def _detect_available_benches(home, mtime):
+    with os.scandir(home) as entries:
+        return sorted(e.name for e in entries if e.name.startswith('frappe-bench') and e.is_dir())
 
 def get_bench_apps(bench_path):
-    """Get installed apps from a bench"""
+    """Get installed apps from a bench (read from sites/apps.txt, no subprocess)"""
+    apps_file = os.path.join(bench_path, "sites", "apps.txt")
+    return _get_bench_apps(bench_path, _mtime(apps_file), _mtime(os.path.join(bench_path, "apps")))
+
+@lru_cache(maxsize=32)
+def _get_bench_apps(bench_path, apps_file_mtime, apps_dir_mtime):
+    # The mtimes are only part of the cache key: editing apps.txt or adding an
+    # app directory invalidates the cached list
+    if apps_file_mtime is not None:
+        with open(os.path.join(bench_path, "sites", "apps.txt")) as f:
+            return sorted(f.read().split())
+    
+    # No apps.txt: fall back to app directories that carry a hooks.py
     try:
-        result = subprocess.run(
-            f"cd {bench_path} && bench version",
-            shell=True, capture_output=True, text=True, timeout=30
-        )
-        apps = []
-        for line in result.stdout.strip().split('\n'):
-            if ' ' in line and not line.startswith('✅'):
-                app = line.split()[0]
-                apps.append(app)
-        return sorted(apps)
-    except:
+        with os.scandir(os.path.join(bench_path, "apps")) as entries:
+            return sorted(e.name for e in entries if e.is_dir() and (
+                os.path.exists(os.path.join(e.path, e.name, "hooks.py")) or
+                os.path.exists(os.path.join(e.path, "hooks.py"))))
+    except OSError:
         return []
 
+def get_doctype_record_counts(doctype_names, chunk_size=1000):
+    """Count records for many doctypes, one UNION ALL query per chunk"""
+    counts = dict.fromkeys(doctype_names, 0)
+    if not counts:
+        return counts
+    
+    if frappe.db.db_type != "mariadb":
+        # information_schema lookup and backtick quoting below are MariaDB-only
+        for name in counts:
+            if frappe.db.table_exists(name):
+                counts[name] = frappe.db.count(name)
+        return counts
+    
+    names = list(counts)
+    for i in range(0, len(names), chunk_size):
+        chunk = names[i:i + chunk_size]
+        # Skip doctypes without a table (single/virtual) instead of catching errors per table
+        existing = set(frappe.db.sql_list("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN %s
+        """, (tuple(f"tab{name}" for name in chunk),)))
+        chunk = [name for name in chunk if f"tab{name}" in existing]
+        
+        if chunk:
+            query = " UNION ALL ".join(
+                "SELECT %s, COUNT(*) FROM `tab{}`".format(name.replace("`", "``").replace("%", "%%"))
+                for name in chunk
+            )
+            counts.update(frappe.db.sql(query, tuple(chunk)))
+    return counts
+
+# File under sites/{site}/.cache/ holding the scanned DocType list
+DOCTYPE_CACHE_FILE = "app_migrator_doctypes.json"
+
+def get_cached_doctypes(installed_apps):
+    """
+    Return all DocType rows (name, module, custom, istable), cached on disk.
+    
+    The cache lives in sites/{site}/.cache/ and is keyed by MAX(modified),
+    the row count and the installed apps, so a cheap probe replaces the full
+    read. Writes that leave modified untouched (this tool's bulk UPDATEs)
+    call invalidate_doctype_cache() instead.
+    """
+    latest, total = frappe.db.sql("SELECT MAX(modified), COUNT(*) FROM `tabDocType`")[0]
+    key = f"{latest}|{total}|{','.join(installed_apps)}"
+    cache_file = frappe.get_site_path(".cache", DOCTYPE_CACHE_FILE)
+    
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return [frappe._dict(row) for row in cached["doctypes"]]
+    except (OSError, ValueError):
+        pass
+    
+    doctypes = frappe.get_all("DocType", fields=["name", "module", "custom", "istable"],
+        limit_page_length=0, order_by="name")
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        write_json_output(cache_file, {"key": key, "doctypes": doctypes})
+    except OSError:
+        pass
+    return doctypes
+
+def invalidate_doctype_cache():
+    """Drop the site's scan cache after writing tabDocType without bumping modified"""
+    try:
+        os.remove(frappe.get_site_path(".cache", DOCTYPE_CACHE_FILE))
+    except FileNotFoundError:
+        pass
+
+def bulk_update_doctypes(names, values, chunk_size=100):
+    """Set the same column values on many DocType rows, one UPDATE per chunk"""
+    assignments = ", ".join(f"`{column}` = %s" for column in values)
+    names = list(names)
+    invalidate_doctype_cache()
+    for i in range(0, len(names), chunk_size):
+        frappe.db.sql(f"UPDATE `tabDocType` SET {assignments} WHERE name IN %s",
+            (*values.values(), tuple(names[i:i + chunk_size])))
+
+# Directories inside an app that never hold DocType definitions
+_NON_SOURCE_DIRS = frozenset({'.git', '.github', 'node_modules', '__pycache__', 'public', 'dist'})
+
+def iter_doctype_json_files(app_path):
+    """Yield the JSON files inside doctype/ folders of an app, pruning non-source trees"""
+    doctype_marker = f"{os.sep}doctype{os.sep}"
+    for root, dirs, files in os.walk(app_path):
+        dirs[:] = [d for d in dirs if d not in _NON_SOURCE_DIRS]
+        if doctype_marker in root:
+            for f in files:
+                if f.endswith('.json') and not f.startswith('_'):
+                    yield os.path.join(root, f)
+
+def write_json_output(path, data):
+    """Write a scan/conflicts/plan result as compact JSON (orjson when available)"""
+    if not orjson:
+        # json.dump encodes and writes chunk by chunk
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        return
+    
+    # orjson only encodes whole objects, so stream the top-level lists row by
+    # row; only one row's bytes are held next to the dict at a time
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        for i, (key, value) in enumerate(data.items()):
+            f.write(b'%s%s:' % (b',' if i else b'', orjson.dumps(str(key))))
+            if isinstance(value, list):
+                f.write(b'[')
+                for j, row in enumerate(value):
+                    if j:
+                        f.write(b',')
+                    f.write(orjson.dumps(row, default=str))
+                f.write(b']')
+            else:
+                f.write(orjson.dumps(value, default=str))
+        f.write(b'}')
+
+OUTPUT_FORMATS = ('json', 'msgpack')
+
+def write_output(path, data, output_format=None):
+    """Write a scan/conflicts/plan result as JSON or msgpack (picked from the extension)"""
+    output_format = output_format or ('msgpack' if path.endswith('.msgpack') else 'json')
+    if output_format == 'json':
+        write_json_output(path, data)
+        return
+    msgpack = _import_msgpack()
+    with open(path, 'wb') as f:
+        f.write(msgpack.packb(data, use_bin_type=True, default=str))
+
+def read_output(path, input_format=None):
+    """Load a result written by write_output, JSON or msgpack (picked from the extension)"""
+    input_format = input_format or ('msgpack' if path.endswith('.msgpack') else 'json')
+    with open(path, 'rb') as f:
+        content = f.read()
+    if input_format == 'msgpack':
+        return _import_msgpack().unpackb(content, raw=False)
+    return orjson.loads(content) if orjson else json.loads(content)
+
+def _import_msgpack():
+    # Optional dependency, only needed for binary output
+    try:
+        import msgpack
+    except ImportError:
+        raise click.ClickException("msgpack output needs the msgpack package: pip install msgpack")
+    return msgpack
+
+@contextmanager
+def frappe_site(site):
+    """
+    Connect to a site for the duration of a command.
+    
+    frappe.init() and frappe.connect() run once per site per process, so
+    chained commands reuse both the loaded site config and the connection.
+    Anything left uncommitted when the outermost block exits is rolled back,
+    which is what closing the connection used to do.
+    """
+    global _initialized_site, _site_depth
+    if _site_depth == 0 and _initialized_site != site:
+        if _initialized_site is not None:
+            frappe.db.close()
+            frappe.destroy()
+        frappe.init(site=site)
+        frappe.connect()
+        _initialized_site = site
+    _site_depth += 1
+    try:
+        yield
+    finally:
+        _site_depth -= 1
+        if _site_depth == 0:
+            frappe.db.rollback()
+
+def get_installed_apps():
+    """frappe.get_installed_apps() for the current site, memoized for the process"""
+    site = frappe.local.site
+    if site not in _installed_apps_cache:
+        _installed_apps_cache[site] = frappe.get_installed_apps()
+    return list(_installed_apps_cache[site])
+
 class MigrationSession:
     """Session management for migrations"""
     def __init__(self, name):
         self.name = name
         self.session_id = f"session_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        self.session_dir = os.path.expanduser("~/migration_sessions")
+        self.session_dir = SESSIONS_DIR
         self.session_file = f"{self.session_dir}/{self.session_id}.json"
         self.data = {
             "metadata": {"name": name, "session_id": self.session_id, 
                         "start_time": datetime.now().isoformat(), "status": "active"},
-            "progress": {"completed_apps": [], "failed_apps": []},
             "migration_plan": {}
         }
         os.makedirs(self.session_dir, exist_ok=True)
     
     def save(self):
-        with open(self.session_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        """Rewrite the (small) session file atomically; progress goes to the events log"""
+        if orjson:
+            content = orjson.dumps(self.data, option=orjson.OPT_INDENT_2)
+        else:
+            content = json.dumps(self.data, indent=2).encode()
+        
+        tmp_file = f"{self.session_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.session_file)
         return self.session_id
     
+    @staticmethod
+    def exists(session_id):
+        return os.path.exists(os.path.join(SESSIONS_DIR, f"{session_id}.json"))
+    
+    @staticmethod
+    def record_progress(session_id, app, failed=False):
+        """Append one completed/failed app to the session's events log"""
+        key = "failed_apps" if failed else "completed_apps"
+        with open(os.path.join(SESSIONS_DIR, f"{session_id}.events.jsonl"), 'a') as f:
+            f.write(json.dumps({"progress": key, "app": app}) + "\n")
+    
     @staticmethod
     def load(session_id):
-        session_file = os.path.expanduser(f"~/migration_sessions/{session_id}.json")
-        if os.path.exists(session_file):
-            with open(session_file, 'r') as f:
-                return json.load(f)
-        return None
+        session_file = os.path.join(SESSIONS_DIR, f"{session_id}.json")
+        if not os.path.exists(session_file):
+            return None
+        with open(session_file, 'r') as f:
+            data = json.load(f)
+        
+        # Session files written before the events log still carry their progress
+        progress = data.setdefault("progress", {"completed_apps": [], "failed_apps": []})
+        events_file = os.path.join(SESSIONS_DIR, f"{session_id}.events.jsonl")
+        if os.path.exists(events_file):
+            with open(events_file, 'r') as f:
+                for line in f:
+                    event = json.loads(line)
+                    progress[event["progress"]].append(event["app"])
+        return data
 
 # ==================== HEALTH COMMAND ====================
 
+HEALTH_BANNER = """\
+============================================================
+🔧 App Migrator Enterprise v{version} - OPERATIONAL
+============================================================
+
+📋 AVAILABLE COMMANDS:
+  Site Analysis:
+    app-migrator-scan --site <name>          Scan site inventory
+    app-migrator-conflicts --site <name>     Detect conflicts
+    app-migrator-clear-cache --site <name>   Remove DocType scan cache
+  Migration:
+    app-migrator-plan --site <name>          Create migration plan
+    app-migrator-execute --site <name>       Execute migration
+  Enterprise:
+    app-migrator-benches                     List all benches
+    app-migrator-apps --site <name>          Downloaded vs installed apps
+    app-migrator-session-start <name>        Start session
+    app-migrator-session-status <id>         Check session
+  Diagnostics:
+    app-migrator-analyze <app>               Analyze app structure
+    app-migrator-fix-orphans --site <name>   Fix orphan doctypes
+    app-migrator-fix-structure <app>         Fix nested folder structure
+  Ping-Pong Staging:
+    app-migrator-create-host <name>          Create staging app
+    app-migrator-stage --site X --source A --host B    Stage doctypes
+    app-migrator-unstage --site X --host B --target C  Unstage doctypes
+============================================================
+"""
+
 @click.command('app-migrator-health')
 @pass_context
 def app_migrator_health(context):
     """Check App Migrator health and list commands"""
-    print("=" * 60)
-    print(f"🔧 App Migrator Enterprise v{__version__} - OPERATIONAL")
-    print("=" * 60)
-    print("\n📋 AVAILABLE COMMANDS:")
-    print("  Site Analysis:")
-    print("    app-migrator-scan --site <name>          Scan site inventory")
-    print("    app-migrator-conflicts --site <name>     Detect conflicts")
-    print("  Migration:")
-    print("    app-migrator-plan --site <name>          Create migration plan")
-    print("    app-migrator-execute --site <name>       Execute migration")
-    print("  Enterprise:")
-    print("    app-migrator-benches                     List all benches")
-    print("    app-migrator-apps --site <name>          Downloaded vs installed apps")
-    print("    app-migrator-session-start <name>        Start session")
-    print("    app-migrator-session-status <id>         Check session")
-    print("  Diagnostics:")
-    print("    app-migrator-analyze <app>               Analyze app structure")
-    print("    app-migrator-fix-orphans --site <name>   Fix orphan doctypes")
-    print("    app-migrator-fix-structure <app>         Fix nested folder structure")
-    print("  Ping-Pong Staging:")
-    print("    app-migrator-create-host <name>          Create staging app")
-    print("    app-migrator-stage --site X --source A --host B    Stage doctypes")
-    print("    app-migrator-unstage --site X --host B --target C  Unstage doctypes")
-    print("=" * 60)
+    sys.stdout.write(HEALTH_BANNER.format(version=__version__))
 
 # ==================== SCAN SITE COMMAND ====================
 
 @click.command('app-migrator-scan')
 @click.option('--site', required=True, help='Site name')
-@click.option('--output', '-o', help='Output JSON file')
+@click.option('--output', '-o', help='Output file (.json or .msgpack)')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), help='Output format (default: from file extension, else json)')
 @pass_context
-def app_migrator_scan(context, site, output):
+def app_migrator_scan(context, site, output, output_format):
     """Scan site for apps, doctypes, custom fields"""
     print(f"🔍 Scanning site: {site}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    result = {
-        "site": site,
-        "timestamp": datetime.now().isoformat(),
-        "frappe_version": getattr(frappe, '__version__', 'unknown'),
-        "apps": frappe.get_installed_apps(),
-        "doctypes": [],
-        "custom_fields": [],
-        "summary": {}
-    }
-    
-    # Get doctypes
-    doctypes = frappe.get_all("DocType", fields=["name", "module", "custom", "istable"])
-    result["doctypes"] = [dict(dt) for dt in doctypes]
-    
-    # Get custom fields
-    custom_fields = frappe.get_all("Custom Field", fields=["name", "dt", "fieldname", "fieldtype"])
-    result["custom_fields"] = [dict(cf) for cf in custom_fields]
-    
-    # Summary
-    result["summary"] = {
-        "apps": len(result["apps"]),
-        "doctypes": len(result["doctypes"]),
-        "custom_doctypes": len([d for d in doctypes if d.custom]),
-        "child_tables": len([d for d in doctypes if d.istable]),
-        "custom_fields": len(result["custom_fields"])
-    }
-    
-    frappe.db.close()
+    with frappe_site(site):
+        result = {
+            "site": site,
+            "timestamp": datetime.now().isoformat(),
+            "frappe_version": getattr(frappe, '__version__', 'unknown'),
+            "apps": get_installed_apps(),
+            "doctypes": [],
+            "custom_fields": [],
+            "summary": {}
+        }
+        
+        # Get doctypes (reused from the on-disk cache while the schema is unchanged)
+        doctypes = get_cached_doctypes(result["apps"])
+        result["doctypes"] = doctypes
+        
+        # Get custom fields
+        custom_fields = frappe.get_all("Custom Field", fields=["name", "dt", "fieldname", "fieldtype"])
+        result["custom_fields"] = custom_fields
+        
+        # Summary (custom/child counts in one pass, no throwaway lists)
+        n_custom = n_table = 0
+        for dt in doctypes:
+            n_custom += bool(dt.custom)
+            n_table += bool(dt.istable)
+        
+        result["summary"] = {
+            "apps": len(result["apps"]),
+            "doctypes": len(result["doctypes"]),
+            "custom_doctypes": n_custom,
+            "child_tables": n_table,
+            "custom_fields": len(result["custom_fields"])
+        }
     
-    # Display
-    print(f"\n📊 SCAN RESULTS:")
-    print(f"   Frappe: {result['frappe_version']}")
-    print(f"   Apps: {result['summary']['apps']}")
-    for app in result["apps"]:
-        print(f"      • {app}")
-    print(f"   DocTypes: {result['summary']['doctypes']}")
-    print(f"   Custom DocTypes: {result['summary']['custom_doctypes']}")
-    print(f"   Child Tables: {result['summary']['child_tables']}")
-    print(f"   Custom Fields: {result['summary']['custom_fields']}")
+    # Display (one write for the whole summary)
+    lines = [
+        f"\n📊 SCAN RESULTS:",
+        f"   Frappe: {result['frappe_version']}",
+        f"   Apps: {result['summary']['apps']}",
+    ]
+    lines.extend(f"      • {app}" for app in result["apps"])
+    lines.extend([
+        f"   DocTypes: {result['summary']['doctypes']}",
+        f"   Custom DocTypes: {result['summary']['custom_doctypes']}",
+        f"   Child Tables: {result['summary']['child_tables']}",
+        f"   Custom Fields: {result['summary']['custom_fields']}",
+    ])
+    print("\n".join(lines))
     
     if output:
-        with open(output, 'w') as f:
-            json.dump(result, f, indent=2)
+        write_output(output, result, output_format)
         print(f"\n✅ Saved to: {output}")
 
+# ==================== CLEAR CACHE COMMAND ====================
+
+@click.command('app-migrator-clear-cache')
+@click.option('--site', help='Site name (defaults to the current site)')
+@pass_context
+def app_migrator_clear_cache(context, site):
+    """Remove the site's on-disk DocType scan cache"""
+    if not site:
+        site = get_current_site()
+        if not site:
+            print("❌ No site specified and no current site set. Use --site or 'bench use <site>'")
+            return
+    
+    # Only the site path is needed, so init without opening a DB connection
+    frappe.init(site=site)
+    try:
+        cache_file = frappe.get_site_path(".cache", DOCTYPE_CACHE_FILE)
+    finally:
+        frappe.destroy()
+    
+    try:
+        os.remove(cache_file)
+        print(f"✅ Removed DocType scan cache: {cache_file}")
+    except FileNotFoundError:
+        print(f"ℹ️ No DocType scan cache for {site}, nothing removed")
+
 # ==================== DETECT CONFLICTS COMMAND ====================
 
 @click.command('app-migrator-conflicts')
 @click.option('--site', required=True, help='Site name')
 @click.option('--apps', help='Comma-separated apps to analyze')
 @click.option('--all-apps', 'all_apps', is_flag=True, default=False, help='Scan ALL apps in apps folder (not just installed)')
-@click.option('--output', '-o', help='Output JSON file')
+@click.option('--output', '-o', help='Output file (.json or .msgpack)')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), help='Output format (default: from file extension, else json)')
 @pass_context
-def app_migrator_conflicts(context, site, apps, all_apps, output):
+def app_migrator_conflicts(context, site, apps, all_apps, output, output_format):
     """Detect conflicts between apps (use --all-apps to include uninstalled apps)"""
     print(f"🔍 Detecting conflicts in: {site}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    from collections import defaultdict
-    doctype_to_apps = defaultdict(list)
-    
-    # Determine apps path
-    # frappe.get_app_path('frappe') returns e.g. /home/frappe/frappe-bench/apps/frappe/frappe
-    # We need /home/frappe/frappe-bench/apps
-    apps_path = os.path.dirname(os.path.dirname(frappe.get_app_path('frappe')))
-    
-    if all_apps:
-        # Scan ALL apps in apps folder by reading doctype JSON files
-        click.secho("📂 Scanning ALL apps in apps folder (including uninstalled)...", fg="cyan")
-        apps_list = []
+    with frappe_site(site):
+        from collections import defaultdict
+        doctype_to_apps = defaultdict(set)
         
-        for app_name in os.listdir(apps_path):
-            app_dir = os.path.join(apps_path, app_name)
-            if not os.path.isdir(app_dir) or app_name.startswith('.'):
-                continue
-            
-            # Check if it's a valid Frappe app
-            has_hooks = os.path.exists(os.path.join(app_dir, app_name, "hooks.py")) or \
-                       os.path.exists(os.path.join(app_dir, "hooks.py"))
-            has_pyproject = os.path.exists(os.path.join(app_dir, "pyproject.toml"))
+        # Determine apps path
+        # frappe.get_app_path('frappe') returns e.g. /home/frappe/frappe-bench/apps/frappe/frappe
+        # We need /home/frappe/frappe-bench/apps
+        apps_path = os.path.dirname(os.path.dirname(frappe.get_app_path('frappe')))
+        
+        if all_apps:
+            # Scan ALL apps in apps folder by reading doctype JSON files
+            click.secho("📂 Scanning ALL apps in apps folder (including uninstalled)...", fg="cyan")
+            apps_list = []
             
-            if not (has_hooks or has_pyproject):
-                continue
+            with os.scandir(apps_path) as entries:
+                app_entries = [e for e in entries if e.is_dir() and not e.name.startswith('.')]
+            for entry in app_entries:
+                app_name, app_dir = entry.name, entry.path
+                
+                # Check if it's a valid Frappe app
+                has_hooks = os.path.exists(os.path.join(app_dir, app_name, "hooks.py")) or \
+                           os.path.exists(os.path.join(app_dir, "hooks.py"))
+                has_pyproject = os.path.exists(os.path.join(app_dir, "pyproject.toml"))
                 
-            apps_list.append(app_name)
+                if not (has_hooks or has_pyproject):
+                    continue
+                    
+                apps_list.append(app_name)
+                
+                # Find all doctype JSON files in this app
+                for json_path in iter_doctype_json_files(app_dir):
+                    try:
+                        with open(json_path) as jf:
+                            data = json.load(jf)
+                            if data.get('doctype') == 'DocType':
+                                dt_name = data.get('name')
+                                if dt_name:
+                                    doctype_to_apps[dt_name].add(app_name)
+                    except:
+                        pass
             
-            # Find all doctype JSON files in this app
-            for root, dirs, files in os.walk(app_dir):
-                if '/doctype/' in root or '\\doctype\\' in root:
-                    for f in files:
-                        if f.endswith('.json') and not f.startswith('_'):
-                            json_path = os.path.join(root, f)
-                            try:
-                                with open(json_path) as jf:
-                                    data = json.load(jf)
-                                    if data.get('doctype') == 'DocType':
-                                        dt_name = data.get('name')
-                                        if dt_name:
-                                            if app_name not in doctype_to_apps[dt_name]:
-                                                doctype_to_apps[dt_name].append(app_name)
-                            except:
-                                pass
-        
-        print(f"   Found {len(apps_list)} apps: {', '.join(sorted(apps_list))}")
-    else:
-        # Original behavior - only installed apps via database
-        apps_list = apps.split(',') if apps else frappe.get_installed_apps()
+            print(f"   Found {len(apps_list)} apps: {', '.join(sorted(apps_list))}")
+        else:
+            # Original behavior - only installed apps via database
+            apps_list = tuple(a.strip() for a in apps.split(',')) if apps else tuple(get_installed_apps())
+            
+            orphans = []
+            if frappe.db.db_type != "mariadb":
+                # GROUP_CONCAT/IFNULL below are MariaDB-only; group in Python instead
+                doctypes = frappe.get_all("DocType",
+                    filters={"module": ["in", list(apps_list) + ["", None]]},
+                    fields=["name", "module", "custom"],
+                    limit_page_length=0, order_by="name")
+                for dt in doctypes:
+                    if dt.module:
+                        doctype_to_apps[dt.name].add(dt.module)
+                    elif not dt.custom:
+                        orphans.append(dt)
+            else:
+                # Let the database group duplicates and pick out orphans in one round trip
+                rows = frappe.db.sql("""
+                    SELECT 'duplicate' AS kind, name, GROUP_CONCAT(DISTINCT module) AS apps
+                    FROM `tabDocType`
+                    WHERE module IN %(apps)s
+                    GROUP BY name
+                    HAVING COUNT(DISTINCT module) > 1
+                    UNION ALL
+                    SELECT 'orphan', name, NULL
+                    FROM `tabDocType`
+                    WHERE IFNULL(module, '') = '' AND custom = 0
+                """, {"apps": apps_list}, as_dict=True)
+                for row in rows:
+                    if row.kind == "duplicate":
+                        doctype_to_apps[row.name].update(row.apps.split(","))
+                    else:
+                        orphans.append(row)
         
-        for app in apps_list:
-            doctypes = frappe.get_all("DocType", filters={"module": app}, fields=["name"])
-            for dt in doctypes:
-                doctype_to_apps[dt.name].append(app)
-    
-    result = {
-        "site": site,
-        "apps_analyzed": sorted(apps_list),
-        "scan_mode": "all_apps" if all_apps else "installed_only",
-        "timestamp": datetime.now().isoformat(),
-        "conflicts": {
-            "duplicate_doctypes": [],
-            "orphan_doctypes": [],
-            "field_conflicts": []
+        result = {
+            "site": site,
+            "apps_analyzed": sorted(apps_list),
+            "scan_mode": "all_apps" if all_apps else "installed_only",
+            "timestamp": datetime.now().isoformat(),
+            "conflicts": {
+                "duplicate_doctypes": [],
+                "orphan_doctypes": [],
+                "field_conflicts": []
+            }
         }
-    }
-    
-    # Duplicate doctypes (found in multiple apps)
-    for dt, dt_apps in doctype_to_apps.items():
-        if len(dt_apps) > 1:
-            result["conflicts"]["duplicate_doctypes"].append({
-                "doctype": dt, "apps": sorted(dt_apps)
-            })
-    
-    # Orphan doctypes (only for installed apps mode)
-    if not all_apps:
-        orphans = frappe.get_all("DocType", 
-            filters={"module": ["in", ["", None]], "custom": 0},
-            fields=["name"])
-        result["conflicts"]["orphan_doctypes"] = [{"doctype": o.name} for o in orphans]
-    
-    frappe.db.close()
+        
+        # Duplicate doctypes (found in multiple apps)
+        for dt, dt_apps in doctype_to_apps.items():
+            if len(dt_apps) > 1:
+                result["conflicts"]["duplicate_doctypes"].append({
+                    "doctype": dt, "apps": sorted(dt_apps)
+                })
+        
+        # Orphan doctypes (only for installed apps mode)
+        if not all_apps:
+            result["conflicts"]["orphan_doctypes"] = [{"doctype": o.name} for o in orphans]
     
-    # Display
+    # Display (one write for the whole summary)
     total = len(result["conflicts"]["duplicate_doctypes"]) + len(result["conflicts"]["orphan_doctypes"])
-    print(f"\n📊 CONFLICT SUMMARY:")
-    print(f"   Scan Mode: {'All Apps (filesystem)' if all_apps else 'Installed Apps (database)'}")
-    print(f"   Apps Scanned: {len(apps_list)}")
-    print(f"   Duplicate DocTypes: {len(result['conflicts']['duplicate_doctypes'])}")
+    lines = [
+        f"\n📊 CONFLICT SUMMARY:",
+        f"   Scan Mode: {'All Apps (filesystem)' if all_apps else 'Installed Apps (database)'}",
+        f"   Apps Scanned: {len(apps_list)}",
+        f"   Duplicate DocTypes: {len(result['conflicts']['duplicate_doctypes'])}",
+    ]
     if not all_apps:
-        print(f"   Orphan DocTypes: {len(result['conflicts']['orphan_doctypes'])}")
-    print(f"   Total Issues: {total}")
+        lines.append(f"   Orphan DocTypes: {len(result['conflicts']['orphan_doctypes'])}")
+    lines.append(f"   Total Issues: {total}")
     
     if result["conflicts"]["duplicate_doctypes"]:
-        print("\n⚠️ DUPLICATE DOCTYPES (same name in multiple apps):")
-        for dup in result["conflicts"]["duplicate_doctypes"]:
-            print(f"   • {dup['doctype']} → {dup['apps']}")
+        lines.append("\n⚠️ DUPLICATE DOCTYPES (same name in multiple apps):")
+        lines.extend(f"   • {dup['doctype']} → {dup['apps']}"
+                     for dup in result["conflicts"]["duplicate_doctypes"])
+    print("\n".join(lines))
     
     if output:
-        with open(output, 'w') as f:
-            json.dump(result, f, indent=2)
+        write_output(output, result, output_format)
         print(f"\n✅ Saved to: {output}")
 
 # ==================== GENERATE PLAN COMMAND ====================
@@ -372,103 +682,159 @@ def app_migrator_conflicts(context, site, apps, all_apps, output):
 @click.option('--site', required=True, help='Site name')
 @click.option('--source-apps', required=True, help='Source apps (comma-separated)')
 @click.option('--target-app', required=True, help='Target consolidated app')
-@click.option('--output', '-o', required=True, help='Output plan file')
+@click.option('--output', '-o', required=True, help='Output plan file (.json or .msgpack)')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), help='Output format (default: from file extension, else json)')
 @pass_context
-def app_migrator_plan(context, site, source_apps, target_app, output):
+def app_migrator_plan(context, site, source_apps, target_app, output, output_format):
     """Generate a migration plan"""
     print(f"📋 Generating migration plan")
     print(f"   Source: {source_apps}")
     print(f"   Target: {target_app}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    apps_list = [a.strip() for a in source_apps.split(',')]
-    
-    plan = {
-        "version": "9.0.0",
-        "created": datetime.now().isoformat(),
-        "source_apps": apps_list,
-        "target_app": target_app,
-        "doctypes": [],
-        "custom_fields": [],
-        "data_migration": []
-    }
-    
-    for app in apps_list:
+    with frappe_site(site):
+        apps_list = tuple(a.strip() for a in source_apps.split(','))
+        
+        plan = {
+            "version": "9.0.0",
+            "created": datetime.now().isoformat(),
+            "source_apps": apps_list,
+            "target_app": target_app,
+            "doctypes": [],
+            "custom_fields": [],
+            "data_migration": []
+        }
+        
         doctypes = frappe.get_all("DocType", 
-            filters={"module": app}, 
-            fields=["name", "module", "istable"])
+            filters={"module": ["in", apps_list]}, 
+            fields=["name", "module", "istable"],
+            limit_page_length=0, order_by="name")
         
+        app_doctypes = {}
         for dt in doctypes:
-            try:
-                count = frappe.db.count(dt.name)
-            except:
-                count = 0
-            
-            plan["doctypes"].append({
-                "name": dt.name,
+            app_doctypes.setdefault(dt["module"], []).append((dt["name"], dt["istable"]))
+        
+        counts = get_doctype_record_counts([dt["name"] for dt in doctypes])
+        
+        for app, module_doctypes in app_doctypes.items():
+            plan["doctypes"].extend({
+                "name": name,
                 "source_app": app,
                 "target_app": target_app,
-                "is_child": dt.istable,
-                "record_count": count
-            })
-            
-            if count > 0:
-                plan["data_migration"].append({
-                    "doctype": dt.name,
-                    "records": count,
-                    "action": "migrate"
-                })
-    
-    frappe.db.close()
+                "is_child": istable,
+                "record_count": counts[name]
+            } for name, istable in module_doctypes)
+        
+        plan["data_migration"] = [
+            {"doctype": entry["name"], "records": entry["record_count"], "action": "migrate"}
+            for entry in plan["doctypes"] if entry["record_count"] > 0
+        ]
     
-    with open(output, 'w') as f:
-        json.dump(plan, f, indent=2)
+    write_output(output, plan, output_format)
     
-    print(f"\n✅ Plan saved: {output}")
-    print(f"   DocTypes: {len(plan['doctypes'])}")
-    print(f"   Data migrations: {len(plan['data_migration'])}")
-    print(f"\n📋 Next: bench app-migrator-execute --site {site} --plan {output} --dry-run")
+    print("\n".join([
+        f"\n✅ Plan saved: {output}",
+        f"   DocTypes: {len(plan['doctypes'])}",
+        f"   Data migrations: {len(plan['data_migration'])}",
+        f"\n📋 Next: bench app-migrator-execute --site {site} --plan {output} --dry-run",
+    ]))
 
 # ==================== EXECUTE PLAN COMMAND ====================
 
+# Plan rows per bulk UPDATE, keeps each statement well under max_allowed_packet
+EXECUTE_CHUNK_SIZE = 1000
+
 @click.command('app-migrator-execute')
 @click.option('--site', required=True, help='Site name')
 @click.option('--plan', 'plan_file', required=True, help='Migration plan file')
 @click.option('--dry-run/--apply', default=True, help='Dry run or apply')
+@click.option('--direct', is_flag=True, default=False, help="Move all doctypes of the plan's source apps in one UPDATE")
+@click.option('--session', 'session_id', help='Record the source apps as completed/failed in this migration session')
+@click.option('--format', 'input_format', type=click.Choice(OUTPUT_FORMATS), help='Plan file format (default: from file extension, else json)')
 @pass_context
-def app_migrator_execute(context, site, plan_file, dry_run):
+def app_migrator_execute(context, site, plan_file, dry_run, direct, session_id, input_format):
     """Execute a migration plan"""
     mode = "DRY-RUN" if dry_run else "APPLY"
     print(f"🚀 Executing migration [{mode}]")
     print("=" * 60)
     
-    with open(plan_file, 'r') as f:
-        plan = json.load(f)
+    plan = read_output(plan_file, input_format)
+    
+    if session_id and not MigrationSession.exists(session_id):
+        print(f"❌ Session not found: {session_id}")
+        return
     
     if not dry_run:
         if not click.confirm("⚠️ This will modify your database. Continue?"):
             print("❌ Cancelled")
             return
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    tracker = ProgressTracker("Migration", len(plan["doctypes"]))
-    
-    for dt in plan["doctypes"]:
-        tracker.update(f"Processing {dt['name']}")
-        if not dry_run:
-            frappe.db.sql("""
-                UPDATE `tabDocType` SET module = %s WHERE name = %s
-            """, (dt["target_app"], dt["name"]))
-    
-    if not dry_run:
-        frappe.db.commit()
+    # Progress is recorded per source app once the whole plan committed or failed
+    record = session_id and not dry_run
+    try:
+        with frappe_site(site):
+            if direct:
+                # Trust the plan's source apps and move all their doctypes in one statement
+                target_app = plan["target_app"]
+                tracker = ProgressTracker("Migration", 1)
+                tracker.update(f"Processing {', '.join(plan['source_apps'])} → {target_app}")
+                if not dry_run:
+                    frappe.db.sql("""
+                        UPDATE `tabDocType` SET module = %s WHERE module IN %s AND module != %s
+                    """, (target_app, tuple(plan["source_apps"]), target_app))
+                    frappe.db.commit()
+                    invalidate_doctype_cache()
+            else:
+                targets = {dt["name"]: dt["target_app"] for dt in plan["doctypes"]}
+            
+                # Report progress once per target app rather than once per doctype
+                groups = {}
+                for name, target_app in targets.items():
+                    groups.setdefault(target_app, []).append(name)
+            
+                tracker = ProgressTracker("Migration", len(groups))
+                for target_app, names in groups.items():
+                    tracker.update(f"Processing {len(names)} DocTypes → {target_app}")
+            
+                if not dry_run and targets:
+                    # Skip doctypes already in their target module (no-op re-runs write nothing)
+                    current = dict(frappe.db.sql(
+                        "SELECT name, module FROM `tabDocType` WHERE name IN %s", (tuple(targets),)))
+                    targets = {name: module for name, module in targets.items()
+                               if name in current and current[name] != module}
+            
+                if not dry_run and targets and frappe.db.db_type != "mariadb":
+                    # UPDATE ... JOIN is MariaDB-only; one IN-list UPDATE per target app
+                    moves = {}
+                    for name, module in targets.items():
+                        moves.setdefault(module, []).append(name)
+                    for module, names in moves.items():
+                        bulk_update_doctypes(names, {"module": module})
+                    frappe.db.commit()
+                elif not dry_run and targets:
+                    # Apply the moves by joining against the plan rows, 1000 per statement
+                    items = list(targets.items())
+                    for i in range(0, len(items), EXECUTE_CHUNK_SIZE):
+                        chunk = items[i:i + EXECUTE_CHUNK_SIZE]
+                        mapping = " UNION ALL ".join(["SELECT %s AS name, %s AS module"] * len(chunk))
+                        frappe.db.sql(f"""
+                            UPDATE `tabDocType` dt
+                            JOIN ({mapping}) m ON dt.name = m.name
+                            SET dt.module = m.module
+                        """, tuple(value for item in chunk for value in item))
+                
+                    frappe.db.commit()
+                    invalidate_doctype_cache()
+            
+    except Exception:
+        if record:
+            for app in plan["source_apps"]:
+                MigrationSession.record_progress(session_id, app, failed=True)
+        raise
+    if record:
+        for app in plan["source_apps"]:
+            MigrationSession.record_progress(session_id, app)
     
-    frappe.db.close()
     tracker.complete()
     
     if dry_run:
@@ -488,9 +854,13 @@ def app_migrator_benches(context):
     benches = detect_available_benches()
     print(f"Found {len(benches)} benches:\n")
     
-    for bench in benches:
-        bench_path = os.path.expanduser(f"~/{bench}")
-        apps = get_bench_apps(bench_path)
+    # Read the benches concurrently (independent filesystem I/O), print in order
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        bench_apps = list(executor.map(
+            lambda bench: get_bench_apps(os.path.join(HOME, bench)), benches))
+    
+    for bench, apps in zip(benches, bench_apps, strict=True):
         print(f"📦 {bench}: {len(apps)} apps")
         for app in apps:
             print(f"   • {app}")
@@ -507,7 +877,8 @@ def app_migrator_session_start(context, name):
     session_id = session.save()
     print(f"✅ Session started: {name}")
     print(f"📁 Session ID: {session_id}")
-    print(f"\n   Check status: bench app-migrator-session-status {session_id}")
+    print(f"\n   Record progress: bench app-migrator-execute ... --session {session_id}")
+    print(f"   Check status: bench app-migrator-session-status {session_id}")
 
 @click.command('app-migrator-session-status')
 @click.argument('session_id')
@@ -539,18 +910,18 @@ def app_migrator_apps(context, site):
     print("=" * 60)
     
     # Get downloaded apps from apps directory
-    apps_dir = os.path.expanduser("~/frappe-bench/apps")
+    apps_dir = APPS_DIR
     downloaded = []
     if os.path.exists(apps_dir):
-        for item in os.listdir(apps_dir):
-            item_path = os.path.join(apps_dir, item)
-            if os.path.isdir(item_path) and not item.startswith('.'):
-                # Check if it's a valid Frappe app
-                has_hooks = os.path.exists(os.path.join(item_path, item, "hooks.py")) or \
-                           os.path.exists(os.path.join(item_path, "hooks.py"))
-                has_pyproject = os.path.exists(os.path.join(item_path, "pyproject.toml"))
-                if has_hooks or has_pyproject:
-                    downloaded.append(item)
+        with os.scandir(apps_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_dir():
+                    continue
+                # Check if it's a valid Frappe app (stop at the first marker found)
+                if (os.path.exists(os.path.join(entry.path, "pyproject.toml")) or
+                        os.path.exists(os.path.join(entry.path, entry.name, "hooks.py")) or
+                        os.path.exists(os.path.join(entry.path, "hooks.py"))):
+                    downloaded.append(entry.name)
     
     downloaded = sorted(downloaded)
     
@@ -558,20 +929,20 @@ def app_migrator_apps(context, site):
     installed = []
     if site:
         try:
-            frappe.init(site=site)
-            frappe.connect()
-            installed = frappe.get_installed_apps()
-            frappe.db.close()
+            with frappe_site(site):
+                installed = get_installed_apps()
         except:
             pass
     
+    installed_set = frozenset(installed)
     print(f"\n📥 DOWNLOADED APPS ({len(downloaded)}):")
     for app in downloaded:
-        status = "✅ installed" if app in installed else "⬜ not installed"
+        status = "✅ installed" if app in installed_set else "⬜ not installed"
         print(f"   {app:30} {status}")
     
     if site and installed:
-        not_downloaded = [a for a in installed if a not in downloaded]
+        downloaded_set = frozenset(downloaded)
+        not_downloaded = [a for a in installed if a not in downloaded_set]
         if not_downloaded:
             print(f"\n⚠️ INSTALLED BUT NOT IN APPS DIR:")
             for app in not_downloaded:
@@ -596,97 +967,105 @@ def app_migrator_fix_orphans(context, site, target_module, dry_run):
     print(f"   Site: {site}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    # Find orphan doctypes - those with empty/null module or module not matching any app
-    installed_apps = frappe.get_installed_apps()
-    
-    # Get all modules from installed apps
-    valid_modules = set()
-    for app in installed_apps:
-        try:
-            modules = frappe.get_all("Module Def", filters={"app_name": app}, pluck="name")
-            valid_modules.update(modules)
-        except:
-            pass
-    
-    # Also add app names as valid modules (some doctypes use app name as module)
-    valid_modules.update(installed_apps)
-    
-    # Find orphans
-    orphans = []
-    
-    # 1. DocTypes with empty/null module
-    empty_module = frappe.get_all("DocType", 
-        filters=[["module", "in", ["", None]]],
-        fields=["name", "module", "custom"])
-    orphans.extend([{"name": d.name, "module": d.module or "(empty)", "type": "empty_module", "custom": d.custom} for d in empty_module])
-    
-    # 2. DocTypes with module not in valid_modules (excluding custom doctypes)
-    all_doctypes = frappe.get_all("DocType", 
-        filters={"custom": 0},
-        fields=["name", "module"])
-    
-    for dt in all_doctypes:
-        if dt.module and dt.module not in valid_modules:
-            orphans.append({"name": dt.name, "module": dt.module, "type": "invalid_module", "custom": 0})
-    
-    # 3. Custom Fields with orphan dt
-    orphan_custom_fields = frappe.db.sql("""
-        SELECT cf.name, cf.dt, cf.fieldname
-        FROM `tabCustom Field` cf
-        LEFT JOIN `tabDocType` dt ON cf.dt = dt.name
-        WHERE dt.name IS NULL
-    """, as_dict=True)
-    
-    print(f"\n📊 ORPHAN ANALYSIS:")
-    print(f"   DocTypes with empty module: {len([o for o in orphans if o['type'] == 'empty_module'])}")
-    print(f"   DocTypes with invalid module: {len([o for o in orphans if o['type'] == 'invalid_module'])}")
-    print(f"   Orphan Custom Fields: {len(orphan_custom_fields)}")
-    
-    if orphans:
-        print(f"\n⚠️ ORPHAN DOCTYPES ({len(orphans)}):")
-        for o in orphans[:20]:  # Show first 20
-            print(f"   • {o['name']:40} module='{o['module']}' ({o['type']})")
-        if len(orphans) > 20:
-            print(f"   ... and {len(orphans) - 20} more")
-    
-    if orphan_custom_fields:
-        print(f"\n⚠️ ORPHAN CUSTOM FIELDS ({len(orphan_custom_fields)}):")
-        for cf in orphan_custom_fields[:10]:
-            print(f"   • {cf['name']} → dt='{cf['dt']}'")
-        if len(orphan_custom_fields) > 10:
-            print(f"   ... and {len(orphan_custom_fields) - 10} more")
-    
-    if not dry_run and target_module:
-        print(f"\n🔧 APPLYING FIXES (target module: {target_module})...")
-        fixed = 0
+    with frappe_site(site):
+        # Find orphan doctypes - those with empty/null module or module not matching any app
+        installed_apps = get_installed_apps()
         
-        for o in orphans:
-            # Fix both empty_module and invalid_module types
-            frappe.db.sql("""
-                UPDATE `tabDocType` SET module = %s WHERE name = %s
-            """, (target_module, o['name']))
-            print(f"   📝 Fixed: {o['name']} → {target_module}")
-            fixed += 1
+        if frappe.db.db_type != "mariadb":
+            # IF/IFNULL below are MariaDB-only; filter in Python instead
+            valid_modules = set(frappe.get_all("Module Def",
+                filters={"app_name": ["in", installed_apps]}, pluck="name"))
+            valid_modules.update(installed_apps)
+            
+            orphans = [{"name": d.name, "module": "(empty)", "type": "empty_module", "custom": d.custom}
+                for d in frappe.get_all("DocType", filters=[["module", "in", ["", None]]],
+                    fields=["name", "custom"], limit_page_length=0, order_by="name")]
+            orphans.extend({"name": d.name, "module": d.module, "type": "invalid_module", "custom": 0}
+                for d in frappe.get_all("DocType", filters={"custom": 0},
+                    fields=["name", "module"], limit_page_length=0, order_by="name")
+                if d.module and d.module not in valid_modules)
+        else:
+            # Find orphans in one anti-join: a module is valid if it is a Module Def of an
+            # installed app or the app name itself (some doctypes use app name as module).
+            # Empty modules are orphans regardless of custom; invalid ones only for standard doctypes.
+            orphans = frappe.db.sql("""
+                SELECT dt.name,
+                    IF(IFNULL(dt.module, '') = '', '(empty)', dt.module) AS module,
+                    IF(IFNULL(dt.module, '') = '', 'empty_module', 'invalid_module') AS type,
+                    dt.custom
+                FROM `tabDocType` dt
+                LEFT JOIN `tabModule Def` m ON m.name = dt.module AND m.app_name IN %(apps)s
+                WHERE IFNULL(dt.module, '') = ''
+                    OR (dt.custom = 0 AND m.name IS NULL AND dt.module NOT IN %(apps)s)
+                ORDER BY type, dt.name
+            """, {"apps": tuple(installed_apps)}, as_dict=True)
         
-        # Delete orphan custom fields
-        for cf in orphan_custom_fields:
-            frappe.db.sql("DELETE FROM `tabCustom Field` WHERE name = %s", cf['name'])
+        # Custom Fields with orphan dt
+        orphan_custom_fields = frappe.db.sql("""
+            SELECT cf.name, cf.dt, cf.fieldname
+            FROM `tabCustom Field` cf
+            LEFT JOIN `tabDocType` dt ON cf.dt = dt.name
+            WHERE dt.name IS NULL
+        """, as_dict=True)
         
-        frappe.db.commit()
-        print(f"\n   ✅ Fixed {fixed} doctypes")
-        print(f"   ✅ Deleted {len(orphan_custom_fields)} orphan custom fields")
-    elif not dry_run and not target_module:
-        print(f"\n❌ --target-module required when using --apply")
-    else:
-        print(f"\n📋 Run with --apply --target-module <module> to fix")
-    
-    frappe.db.close()
+        print(f"\n📊 ORPHAN ANALYSIS:")
+        print(f"   DocTypes with empty module: {len([o for o in orphans if o['type'] == 'empty_module'])}")
+        print(f"   DocTypes with invalid module: {len([o for o in orphans if o['type'] == 'invalid_module'])}")
+        print(f"   Orphan Custom Fields: {len(orphan_custom_fields)}")
+        
+        if orphans:
+            print(f"\n⚠️ ORPHAN DOCTYPES ({len(orphans)}):")
+            for o in orphans[:20]:  # Show first 20
+                print(f"   • {o['name']:40} module='{o['module']}' ({o['type']})")
+            if len(orphans) > 20:
+                print(f"   ... and {len(orphans) - 20} more")
+        
+        if orphan_custom_fields:
+            print(f"\n⚠️ ORPHAN CUSTOM FIELDS ({len(orphan_custom_fields)}):")
+            for cf in orphan_custom_fields[:10]:
+                print(f"   • {cf['name']} → dt='{cf['dt']}'")
+            if len(orphan_custom_fields) > 10:
+                print(f"   ... and {len(orphan_custom_fields) - 10} more")
+        
+        if not dry_run and target_module:
+            print(f"\n🔧 APPLYING FIXES (target module: {target_module})...")
+            fixed = len(orphans)
+            
+            if orphans:
+                # Fix both empty_module and invalid_module types in one statement
+                frappe.db.sql("""
+                    UPDATE `tabDocType` SET module = %s WHERE name IN %s
+                """, (target_module, tuple(o['name'] for o in orphans)))
+                print("\n".join(f"   📝 Fixed: {o['name']} → {target_module}" for o in orphans))
+            
+            # Delete orphan custom fields (same join as the detection query)
+            if orphan_custom_fields and frappe.db.db_type != "mariadb":
+                # DELETE ... JOIN is MariaDB-only; delete the detected rows by name
+                frappe.db.sql("DELETE FROM `tabCustom Field` WHERE name IN %s",
+                    (tuple(cf.name for cf in orphan_custom_fields),))
+            elif orphan_custom_fields:
+                frappe.db.sql("""
+                    DELETE cf FROM `tabCustom Field` cf
+                    LEFT JOIN `tabDocType` dt ON cf.dt = dt.name
+                    WHERE dt.name IS NULL
+                """)
+            
+            frappe.db.commit()
+            invalidate_doctype_cache()
+            print(f"\n   ✅ Fixed {fixed} doctypes")
+            print(f"   ✅ Deleted {len(orphan_custom_fields)} orphan custom fields")
+        elif not dry_run and not target_module:
+            print(f"\n❌ --target-module required when using --apply")
+        else:
+            print(f"\n📋 Run with --apply --target-module <module> to fix")
 
 # ==================== ANALYZE APP STRUCTURE (MODERN VS TRADITIONAL) ====================
 
+# Package name ends at the first version specifier, marker or extra
+_REQUIREMENT_SPEC_RE = re.compile(r'[<>=~!;\[ ]')
+# Fallback when no TOML parser is available: any quoted name in pyproject.toml
+_QUOTED_NAME_RE = re.compile(r'"([a-zA-Z0-9_-]+)"')
+
 @click.command('app-migrator-analyze')
 @click.argument('app_name')
 @pass_context
@@ -695,7 +1074,7 @@ def app_migrator_analyze(context, app_name):
     print(f"🔍 ANALYZING APP: {app_name}")
     print("=" * 60)
     
-    app_path = os.path.expanduser(f"~/frappe-bench/apps/{app_name}")
+    app_path = os.path.join(APPS_DIR, app_name)
     
     if not os.path.exists(app_path):
         print(f"❌ App not found: {app_path}")
@@ -747,23 +1126,28 @@ def app_migrator_analyze(context, app_name):
     
     # Detect Python modules in nested package
     if result["nested_package"]:
-        for item in os.listdir(nested_path):
-            item_path = os.path.join(nested_path, item)
-            if os.path.isdir(item_path) and os.path.exists(os.path.join(item_path, "__init__.py")):
-                if item not in ['templates', 'public', 'patches', 'config', '__pycache__']:
-                    if item not in result["modules"]:
-                        result["modules"].append(item)
+        with os.scandir(nested_path) as entries:
+            for entry in entries:
+                if entry.name in ['templates', 'public', 'patches', 'config', '__pycache__']:
+                    continue
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, "__init__.py")):
+                    if entry.name not in result["modules"]:
+                        result["modules"].append(entry.name)
     
     # Read dependencies from pyproject.toml
     if result["has_pyproject"]:
         try:
-            with open(pyproject_path, 'r') as f:
+            with open(pyproject_path, 'rb') as f:
                 content = f.read()
+            if tomllib:
+                requirements = tomllib.loads(content.decode()).get("project", {}).get("dependencies", [])
+                deps = [_REQUIREMENT_SPEC_RE.split(req, 1)[0].strip() for req in requirements]
+            elif b'dependencies' in content:
                 # Simple extraction of dependencies
-                if 'dependencies' in content:
-                    import re
-                    deps = re.findall(r'"([a-zA-Z0-9_-]+)"', content)
-                    result["dependencies"] = [d for d in deps if d not in ['python', 'frappe', app_name]][:10]
+                deps = _QUOTED_NAME_RE.findall(content.decode())
+            else:
+                deps = []
+            result["dependencies"] = [d for d in deps if d not in ['python', 'frappe', app_name]][:10]
         except:
             pass
     
@@ -818,7 +1202,7 @@ def app_migrator_create_host(context, host_app_name):
     print(f"🏗️ CREATE HOST APP: {host_app_name}")
     print("=" * 60)
     
-    apps_dir = os.path.expanduser("~/frappe-bench/apps")
+    apps_dir = APPS_DIR
     host_path = os.path.join(apps_dir, host_app_name)
     
     if os.path.exists(host_path):
@@ -883,161 +1267,167 @@ def app_migrator_stage(context, site, source, host, doctypes, prefix, dry_run):
             return
     mode = "DRY-RUN" if dry_run else "APPLY"
     source_module_title = source.replace("_", " ").title()
+    host_module_title = host.replace("_", " ").title()
     print(f"📤 STAGING DOCTYPES [{mode}]")
     print(f"   Source: {source} (module: {source_module_title})")
     print(f"   Host: {host}")
     print(f"   Prefix: {prefix}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    # Get doctypes from source app - try DB first, then filesystem
-    source_doctypes = []
-    if doctypes:
-        dt_list = [d.strip() for d in doctypes.split(',')]
-        source_doctypes = frappe.get_all("DocType", 
-            filters={"name": ["in", dt_list]},
-            fields=["name", "module"])
-    else:
-        # Try database first
-        source_doctypes = frappe.get_all("DocType", 
-            filters={"module": source_module_title},
-            fields=["name", "module"])
-        
-        # If no DB results, scan filesystem for all modules in the app
-        if not source_doctypes:
-            print(f"   ℹ️ No doctypes in DB for module '{source_module_title}', scanning filesystem...")
-            app_path = os.path.expanduser(f"~/frappe-bench/apps/{source}/{source}")
-            modules_file = os.path.join(app_path, "modules.txt")
-            if os.path.exists(modules_file):
-                with open(modules_file, 'r') as f:
-                    modules = [m.strip() for m in f.readlines() if m.strip()]
-                print(f"   📂 Found modules: {modules}")
-                for module in modules:
-                    module_folder = module.lower().replace(" ", "_")
-                    doctype_path = os.path.join(app_path, module_folder, "doctype")
-                    if os.path.exists(doctype_path):
-                        for dt_folder in os.listdir(doctype_path):
-                            dt_full_path = os.path.join(doctype_path, dt_folder)
-                            if os.path.isdir(dt_full_path) and not dt_folder.startswith("_"):
-                                # Convert folder name to DocType name (snake_case to Title Case)
-                                dt_name = dt_folder.replace("_", " ").title()
-                                source_doctypes.append({"name": dt_name, "module": module})
-    
-    host_module_title = host.replace("_", " ").title()
-    print(f"\n📦 DOCTYPES TO REASSIGN TO MODULE '{host_module_title}' ({len(source_doctypes)}):")
-    staged = []
-    
-    for dt in source_doctypes:
-        dt_name = dt.get('name') if isinstance(dt, dict) else dt.name
-        dt_module = dt.get('module') if isinstance(dt, dict) else dt.module
-        print(f"   • {dt_name} (current: {dt_module})")
-        staged.append({"old_name": dt_name, "old_module": dt_module})
-    
-    if not dry_run:
-        print(f"\n🔧 STAGING (reassigning module via Frappe API)...")
-        
-        # Step 1: Ensure host module exists in Module Def
-        host_module_title = host.replace("_", " ").title()
-        if not frappe.db.exists("Module Def", host_module_title):
-            try:
-                module_doc = frappe.new_doc("Module Def")
-                module_doc.module_name = host_module_title
-                module_doc.app_name = host
-                module_doc.insert(ignore_permissions=True)
-                print(f"   ✅ Created Module Def: {host_module_title}")
-            except Exception as e:
-                print(f"   ⚠️ Module Def creation: {e}")
-        
-        # Step 2: Update modules.txt in host app
-        host_apps_path = os.path.expanduser(f"~/frappe-bench/apps/{host}/{host}/modules.txt")
-        if os.path.exists(host_apps_path):
-            with open(host_apps_path, 'r') as f:
-                modules = [m.strip() for m in f.readlines() if m.strip()]
-            if host_module_title not in modules:
-                modules.append(host_module_title)
-                with open(host_apps_path, 'w') as f:
-                    f.write('\n'.join(modules) + '\n')
-                print(f"   ✅ Updated modules.txt with: {host_module_title}")
+    with frappe_site(site):
+        # Get doctypes from source app - try DB first, then filesystem
+        source_doctypes = []
+        if doctypes:
+            dt_list = [d.strip() for d in doctypes.split(',')]
+            source_doctypes = frappe.get_all("DocType", 
+                filters={"name": ["in", dt_list]},
+                fields=["name", "module"])
         else:
-            # Create modules.txt if host app exists but file doesn't
-            host_app_dir = os.path.expanduser(f"~/frappe-bench/apps/{host}/{host}")
-            if os.path.exists(host_app_dir):
-                with open(host_apps_path, 'w') as f:
-                    f.write(f"{host_module_title}\n")
-                print(f"   ✅ Created modules.txt with: {host_module_title}")
-            else:
-                print(f"   ⚠️ Host app not found at: {host_app_dir}")
-        
-        # Step 3: Copy doctype files from source to host app
-        import shutil
-        import json
-        source_app_path = os.path.expanduser(f"~/frappe-bench/apps/{source}/{source}")
-        host_app_path = os.path.expanduser(f"~/frappe-bench/apps/{host}/{host}")
-        host_module_folder = host_module_title.lower().replace(" ", "_")
-        host_doctype_path = os.path.join(host_app_path, host_module_folder, "doctype")
-        os.makedirs(host_doctype_path, exist_ok=True)
+            # Try database first
+            source_doctypes = frappe.get_all("DocType", 
+                filters={"module": source_module_title},
+                fields=["name", "module"])
+            
+            # If no DB results, scan filesystem for all modules in the app
+            if not source_doctypes:
+                print(f"   ℹ️ No doctypes in DB for module '{source_module_title}', scanning filesystem...")
+                app_path = os.path.join(APPS_DIR, source, source)
+                modules_file = os.path.join(app_path, "modules.txt")
+                if os.path.exists(modules_file):
+                    with open(modules_file, 'r') as f:
+                        modules = [m.strip() for m in f if m.strip()]
+                    print(f"   📂 Found modules: {modules}")
+                    for module in modules:
+                        module_folder = module.lower().replace(" ", "_")
+                        doctype_path = os.path.join(app_path, module_folder, "doctype")
+                        if os.path.exists(doctype_path):
+                            for dt_folder in os.listdir(doctype_path):
+                                dt_full_path = os.path.join(doctype_path, dt_folder)
+                                if os.path.isdir(dt_full_path) and not dt_folder.startswith("_"):
+                                    # Convert folder name to DocType name (snake_case to Title Case)
+                                    dt_name = dt_folder.replace("_", " ").title()
+                                    source_doctypes.append({"name": dt_name, "module": module})
         
-        # Build a map of all doctype folders in source app (search all module dirs)
-        doctype_folder_map = {}
-        for entry in os.listdir(source_app_path):
-            entry_path = os.path.join(source_app_path, entry)
-            doctype_dir = os.path.join(entry_path, "doctype")
-            if os.path.isdir(entry_path) and os.path.exists(doctype_dir):
-                for dt_folder in os.listdir(doctype_dir):
-                    dt_path = os.path.join(doctype_dir, dt_folder)
-                    if os.path.isdir(dt_path) and not dt_folder.startswith("_"):
-                        doctype_folder_map[dt_folder] = dt_path
+        print(f"\n📦 DOCTYPES TO REASSIGN TO MODULE '{host_module_title}' ({len(source_doctypes)}):")
+        staged = []
         
-        print(f"\n📁 COPYING DOCTYPE FILES TO HOST APP...")
+        for dt in source_doctypes:
+            dt_name = dt.get('name') if isinstance(dt, dict) else dt.name
+            dt_module = dt.get('module') if isinstance(dt, dict) else dt.module
+            staged.append({"old_name": dt_name, "old_module": dt_module})
+        if staged:
+            print("\n".join(f"   • {item['old_name']} (current: {item['old_module']})" for item in staged))
         
-        # Step 4: Reassign doctypes to host module AND mark as custom (prevents orphan deletion)
-        success_count = 0
-        for item in staged:
-            dt_name = item["old_name"]
-            dt_folder_name = dt_name.lower().replace(" ", "_")
-            # Use the map to find actual path (handles module name mismatches)
-            source_dt_path = doctype_folder_map.get(dt_folder_name)
-            target_dt_path = os.path.join(host_doctype_path, dt_folder_name)
+        if not dry_run:
+            print(f"\n🔧 STAGING (reassigning module via Frappe API)...")
             
-            try:
-                # Copy doctype folder to host app
-                if os.path.exists(source_dt_path):
-                    if os.path.exists(target_dt_path):
-                        shutil.rmtree(target_dt_path)
-                    shutil.copytree(source_dt_path, target_dt_path)
-                    
-                    # Update module in JSON file
-                    json_file = os.path.join(target_dt_path, f"{dt_folder_name}.json")
-                    if os.path.exists(json_file):
-                        with open(json_file, 'r') as f:
-                            dt_json = json.load(f)
-                        dt_json["module"] = host_module_title
-                        dt_json["custom"] = 1
-                        with open(json_file, 'w') as f:
-                            json.dump(dt_json, f, indent=1)
-                    print(f"   📄 Copied: {dt_name} → {host}/{host_module_folder}/doctype/{dt_folder_name}/")
+            # Step 1: Ensure host module exists in Module Def
+            if not frappe.db.exists("Module Def", host_module_title):
+                try:
+                    module_doc = frappe.new_doc("Module Def")
+                    module_doc.module_name = host_module_title
+                    module_doc.app_name = host
+                    module_doc.insert(ignore_permissions=True)
+                    print(f"   ✅ Created Module Def: {host_module_title}")
+                except Exception as e:
+                    print(f"   ⚠️ Module Def creation: {e}")
+            
+            # Step 2: Update modules.txt in host app
+            host_apps_path = os.path.join(APPS_DIR, host, host, "modules.txt")
+            if os.path.exists(host_apps_path):
+                with open(host_apps_path, 'r') as f:
+                    content = f.read()
+                if host_module_title not in {m.strip() for m in content.splitlines()}:
+                    # Append rather than rewrite; keep the last line terminated
+                    with open(host_apps_path, 'a') as f:
+                        if content and not content.endswith('\n'):
+                            f.write('\n')
+                        f.write(f"{host_module_title}\n")
+                    print(f"   ✅ Updated modules.txt with: {host_module_title}")
+            else:
+                # Create modules.txt if host app exists but file doesn't
+                host_app_dir = os.path.join(APPS_DIR, host, host)
+                if os.path.exists(host_app_dir):
+                    with open(host_apps_path, 'w') as f:
+                        f.write(f"{host_module_title}\n")
+                    print(f"   ✅ Created modules.txt with: {host_module_title}")
+                else:
+                    print(f"   ⚠️ Host app not found at: {host_app_dir}")
+            
+            # Step 3: Copy doctype files from source to host app
+            import shutil
+            import json
+            source_app_path = os.path.join(APPS_DIR, source, source)
+            host_app_path = os.path.join(APPS_DIR, host, host)
+            host_module_folder = host_module_title.lower().replace(" ", "_")
+            host_doctype_path = os.path.join(host_app_path, host_module_folder, "doctype")
+            os.makedirs(host_doctype_path, exist_ok=True)
+            
+            # Build a map of all doctype folders in source app (search all module dirs)
+            doctype_folder_map = {}
+            for entry in os.listdir(source_app_path):
+                entry_path = os.path.join(source_app_path, entry)
+                doctype_dir = os.path.join(entry_path, "doctype")
+                if os.path.isdir(entry_path) and os.path.exists(doctype_dir):
+                    for dt_folder in os.listdir(doctype_dir):
+                        dt_path = os.path.join(doctype_dir, dt_folder)
+                        if os.path.isdir(dt_path) and not dt_folder.startswith("_"):
+                            doctype_folder_map[dt_folder] = dt_path
+            
+            print(f"\n📁 COPYING DOCTYPE FILES TO HOST APP...")
+            
+            # Step 4: Reassign doctypes to host module AND mark as custom (prevents orphan deletion)
+            reassigned = []
+            out = []  # progress lines, written 100 at a time
+            for item in staged:
+                if len(out) >= 100:
+                    print("\n".join(out))
+                    out.clear()
+                dt_name = item["old_name"]
+                dt_folder_name = dt_name.lower().replace(" ", "_")
+                # Use the map to find actual path (handles module name mismatches)
+                source_dt_path = doctype_folder_map.get(dt_folder_name)
+                target_dt_path = os.path.join(host_doctype_path, dt_folder_name)
                 
-                # Update DB record
-                if frappe.db.exists("DocType", dt_name):
-                    frappe.db.set_value("DocType", dt_name, {
-                        "module": host_module_title,
-                        "custom": 1
-                    }, update_modified=False)
-                print(f"   ✅ {dt_name} → module: {host_module_title} (custom=1)")
-                success_count += 1
+                try:
+                    # Copy doctype folder to host app
+                    if os.path.exists(source_dt_path):
+                        if os.path.exists(target_dt_path):
+                            shutil.rmtree(target_dt_path)
+                        shutil.copytree(source_dt_path, target_dt_path)
+                        
+                        # Update module in JSON file
+                        json_file = os.path.join(target_dt_path, f"{dt_folder_name}.json")
+                        if os.path.exists(json_file):
+                            with open(json_file, 'r') as f:
+                                dt_json = json.load(f)
+                            dt_json["module"] = host_module_title
+                            dt_json["custom"] = 1
+                            with open(json_file, 'w') as f:
+                                json.dump(dt_json, f, indent=1)
+                        out.append(f"   📄 Copied: {dt_name} → {host}/{host_module_folder}/doctype/{dt_folder_name}/")
+                    reassigned.append(dt_name)
+                except Exception as e:
+                    out.append(f"   ❌ {dt_name}: {e}")
+            if out:
+                print("\n".join(out))
+            
+            # Update DB records in bulk (missing doctypes are simply not matched);
+            # the Module Def and all module changes commit or roll back together
+            try:
+                bulk_update_doctypes(reassigned, {"module": host_module_title, "custom": 1})
+                frappe.db.commit()
             except Exception as e:
-                print(f"   ❌ {dt_name}: {e}")
-        
-        frappe.db.commit()
-        print(f"\n✅ Reassigned {success_count}/{len(staged)} doctypes to module '{host_module_title}'")
-        print(f"\n📋 To move back to original or new app, run:")
-        print(f"   bench app-migrator-unstage --site {site} --host {host} --target <target_app>")
-    else:
-        print(f"\n📋 Run with --apply to reassign doctypes to host module")
-    
-    frappe.db.close()
+                frappe.db.rollback()
+                print(f"   ❌ Database update failed, no doctypes were reassigned: {e}")
+                reassigned = []
+            if reassigned:
+                print("\n".join(f"   ✅ {dt_name} → module: {host_module_title} (custom=1)" for dt_name in reassigned))
+            print(f"\n✅ Reassigned {len(reassigned)}/{len(staged)} doctypes to module '{host_module_title}'")
+            print(f"\n📋 To move back to original or new app, run:")
+            print(f"   bench app-migrator-unstage --site {site} --host {host} --target <target_app>")
+        else:
+            print(f"\n📋 Run with --apply to reassign doctypes to host module")
 
 # ==================== PING-PONG STAGING: UNSTAGE DOCTYPES ====================
 
@@ -1063,54 +1453,56 @@ def app_migrator_unstage(context, site, host, target, dry_run):
     print(f"   To module: {target_module_title}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    # Get doctypes in the host module
-    host_doctypes = frappe.get_all("DocType", 
-        filters={"module": host_module_title},
-        fields=["name", "module"])
-    
-    print(f"\n📦 DOCTYPES TO REASSIGN ({len(host_doctypes)}):")
-    
-    for dt in host_doctypes:
-        print(f"   • {dt.name}")
-    
-    if not dry_run:
-        print(f"\n🔧 REASSIGNING TO MODULE '{target_module_title}'...")
-        success_count = 0
-        for dt in host_doctypes:
+    with frappe_site(site):
+        # Get doctypes in the host module
+        host_doctypes = frappe.get_all("DocType", 
+            filters={"module": host_module_title},
+            pluck="name", limit_page_length=0, order_by="name")
+        
+        print(f"\n📦 DOCTYPES TO REASSIGN ({len(host_doctypes)}):")
+        
+        if host_doctypes:
+            print("\n".join(f"   • {dt_name}" for dt_name in host_doctypes))
+        
+        if not dry_run:
+            print(f"\n🔧 REASSIGNING TO MODULE '{target_module_title}'...")
+            success_count = 0
             try:
                 # Restore module, set custom=0, and set app field (CRITICAL for orphan prevention)
-                frappe.db.set_value("DocType", dt.name, {
+                bulk_update_doctypes(host_doctypes, {
                     "module": target_module_title,
                     "custom": 0,  # Restore to normal doctype
                     "app": target  # CRITICAL: prevents orphan deletion
-                }, update_modified=False)
-                print(f"   ✅ {dt.name} → module: {target_module_title} (custom=0)")
-                success_count += 1
+                })
+                frappe.db.commit()
+                if host_doctypes:
+                    print("\n".join(f"   ✅ {dt_name} → module: {target_module_title} (custom=0)" for dt_name in host_doctypes))
+                success_count = len(host_doctypes)
             except Exception as e:
-                print(f"   ❌ {dt.name}: {e}")
-        
-        frappe.db.commit()
-        print(f"\n✅ Reassigned {success_count}/{len(host_doctypes)} doctypes to '{target_module_title}'")
-        
-        # Auto-create missing controller files for the target app
-        print(f"\n🔧 Ensuring controller files exist for target app...")
-        created = ensure_controller_files(target, target, dry_run=False)
-        if created:
-            print(f"   Created {len(created)} controller file(s)")
+                frappe.db.rollback()
+                print(f"   ❌ Database update failed, no doctypes were reassigned: {e}")
+            
+            print(f"\n✅ Reassigned {success_count}/{len(host_doctypes)} doctypes to '{target_module_title}'")
+            
+            # Auto-create missing controller files for the target app
+            print(f"\n🔧 Ensuring controller files exist for target app...")
+            created = ensure_controller_files(target, target, dry_run=False)
+            if created:
+                print(f"   Created {len(created)} controller file(s)")
+            else:
+                print(f"   All controller files already exist")
+            
+            print(f"\n📋 Now run: bench --site {site} migrate")
         else:
-            print(f"   All controller files already exist")
-        
-        print(f"\n📋 Now run: bench --site {site} migrate")
-    else:
-        print(f"\n📋 Run with --apply to reassign")
-    
-    frappe.db.close()
+            print(f"\n📋 Run with --apply to reassign")
 
 # ==================== ANALYZE APP STRUCTURE (DETAILED) ====================
 
+def _count_doctype_dirs(doctype_path):
+    """Count DocType folders in a doctype/ directory"""
+    with os.scandir(doctype_path) as entries:
+        return sum(1 for e in entries if e.is_dir() and e.name != '__pycache__')
+
 @click.command('app-migrator-fix-structure')
 @click.argument('app_name')
 @pass_context
@@ -1134,7 +1526,7 @@ def app_migrator_fix_structure(context, app_name):
     print(f"   App: {app_name}")
     print("=" * 60)
     
-    apps_dir = os.path.expanduser("~/frappe-bench/apps")
+    apps_dir = APPS_DIR
     app_path = os.path.join(apps_dir, app_name)
     
     if not os.path.exists(app_path):
@@ -1168,7 +1560,7 @@ def app_migrator_fix_structure(context, app_name):
     modules = []
     if os.path.exists(modules_txt_path):
         with open(modules_txt_path, 'r') as f:
-            modules = [m.strip() for m in f.readlines() if m.strip()]
+            modules = [m.strip() for m in f if m.strip()]
         print(f"\n📦 MODULES DEFINED ({len(modules)}):")
         for m in modules:
             print(f"   • {m}")
@@ -1176,27 +1568,33 @@ def app_migrator_fix_structure(context, app_name):
     # Check module folders at level2
     print(f"\n📂 MODULE FOLDERS AT LEVEL 2:")
     
-    level2_dirs = [d for d in os.listdir(level2) 
-                   if os.path.isdir(os.path.join(level2, d)) 
-                   and not d.startswith('.') 
-                   and d not in ['__pycache__', 'templates', 'public', 'patches', 'config', 'www']]
-    
+    with os.scandir(level2) as entries:
+        level2_dirs = [e.name for e in entries
+                       if e.is_dir()
+                       and not e.name.startswith('.')
+                       and e.name not in ['__pycache__', 'templates', 'public', 'patches', 'config', 'www']]
+
+    # A folder matches modules.txt by title ("Amb W Tds") or by folder name ("amb_w_tds")
+    modules_set = set(modules)
+    modules_snake = {m.lower().replace(" ", "_") for m in modules}
+
     for dir_name in sorted(level2_dirs):
         dir_path = os.path.join(level2, dir_name)
-        has_doctype = os.path.isdir(os.path.join(dir_path, "doctype"))
-        has_page = os.path.isdir(os.path.join(dir_path, "page"))
-        has_report = os.path.isdir(os.path.join(dir_path, "report"))
+        with os.scandir(dir_path) as entries:
+            subdirs = {e.name for e in entries if e.is_dir()}
+        has_doctype = "doctype" in subdirs
+        has_page = "page" in subdirs
+        has_report = "report" in subdirs
         
         if has_doctype or has_page or has_report:
             # This is a module folder
             module_title = dir_name.replace("_", " ").title()
-            in_modules_txt = module_title in modules or dir_name in [m.lower().replace(" ", "_") for m in modules]
+            in_modules_txt = module_title in modules_set or dir_name in modules_snake
             
             doctype_count = 0
             if has_doctype:
                 doctype_path = os.path.join(dir_path, "doctype")
-                doctype_count = len([d for d in os.listdir(doctype_path) 
-                                    if os.path.isdir(os.path.join(doctype_path, d)) and d != '__pycache__'])
+                doctype_count = _count_doctype_dirs(doctype_path)
             
             status = "✅" if in_modules_txt else "⚠️ NOT IN modules.txt"
             print(f"   • {dir_name}/ - {doctype_count} doctypes {status}")
@@ -1211,8 +1609,7 @@ def app_migrator_fix_structure(context, app_name):
     # Check for doctypes directly at level2
     direct_doctype = os.path.join(level2, "doctype")
     if os.path.isdir(direct_doctype):
-        doctype_count = len([d for d in os.listdir(direct_doctype) 
-                            if os.path.isdir(os.path.join(direct_doctype, d)) and d != '__pycache__'])
+        doctype_count = _count_doctype_dirs(direct_doctype)
         print(f"\n⚠️ DOCTYPES DIRECTLY AT LEVEL 2 ({doctype_count}):")
         print(f"   Path: {direct_doctype}")
         print(f"   This is unusual - doctypes should be inside a module folder.")
@@ -1238,6 +1635,15 @@ def app_migrator_fix_structure(context, app_name):
 
 # ==================== ENSURE CONTROLLER FILES ====================
 
+# Minimal controller for a standard (custom=0) DocType
+CONTROLLER_TEMPLATE = """import frappe
+from frappe.model.document import Document
+
+
+class {class_name}(Document):
+    pass
+"""
+
 def ensure_controller_files(app_name, module_name=None, dry_run=True):
     """
     Create missing .py controller files for DocTypes in an app.
@@ -1254,9 +1660,7 @@ def ensure_controller_files(app_name, module_name=None, dry_run=True):
     Returns:
         List of created/would-create file paths
     """
-    import re
-    
-    apps_dir = os.path.expanduser("~/frappe-bench/apps")
+    apps_dir = APPS_DIR
     app_path = os.path.join(apps_dir, app_name, app_name)
     
     if not os.path.isdir(app_path):
@@ -1264,12 +1668,9 @@ def ensure_controller_files(app_name, module_name=None, dry_run=True):
         return []
     
     # Find ALL doctype directories in the app (search all module folders)
-    doctype_paths = []
-    for entry in os.listdir(app_path):
-        entry_path = os.path.join(app_path, entry)
-        doctype_dir = os.path.join(entry_path, "doctype")
-        if os.path.isdir(entry_path) and os.path.exists(doctype_dir):
-            doctype_paths.append(doctype_dir)
+    with os.scandir(app_path) as entries:
+        doctype_paths = [os.path.join(e.path, "doctype") for e in entries
+                         if e.is_dir() and os.path.exists(os.path.join(e.path, "doctype"))]
     
     if not doctype_paths:
         print(f"❌ No doctype folder found for app: {app_name}")
@@ -1280,35 +1681,27 @@ def ensure_controller_files(app_name, module_name=None, dry_run=True):
     created_files = []
     
     for doctype_path in doctype_paths:
-        for item in os.listdir(doctype_path):
-            item_path = os.path.join(doctype_path, item)
-            
-            # Skip non-directories and __pycache__
-            if not os.path.isdir(item_path) or item.startswith('__'):
-                continue
-            
-            doctype_name = item
-            py_file = os.path.join(item_path, f"{doctype_name}.py")
-            json_file = os.path.join(item_path, f"{doctype_name}.json")
+        # Skip non-directories and __pycache__
+        with os.scandir(doctype_path) as entries:
+            doctype_dirs = [e for e in entries if e.is_dir() and not e.name.startswith('__')]
+        for entry in doctype_dirs:
+            doctype_name = entry.name
+            py_file = os.path.join(entry.path, f"{doctype_name}.py")
+            # One directory read answers both existence checks
+            with os.scandir(entry.path) as files:
+                file_names = {f.name for f in files}
             
             # Only create .py if .json exists but .py doesn't
-            if os.path.exists(json_file) and not os.path.exists(py_file):
+            if f"{doctype_name}.json" in file_names and f"{doctype_name}.py" not in file_names:
                 # Convert doctype_name to PascalCase class name
                 # e.g., 'third_party_api' -> 'ThirdPartyApi'
                 class_name = ''.join(word.capitalize() for word in doctype_name.split('_'))
                 
-                controller_content = f'''import frappe
-from frappe.model.document import Document
-
-class {class_name}(Document):
-    pass
-'''
-                
                 if dry_run:
                     print(f"   Would create: {py_file}")
                 else:
-                    with open(py_file, 'w') as f:
-                        f.write(controller_content)
+                    with open(py_file, 'wb') as f:
+                        f.write(CONTROLLER_TEMPLATE.format(class_name=class_name).encode())
                     print(f"   ✅ Created: {py_file}")
                 
                 created_files.append(py_file)
@@ -1375,47 +1768,57 @@ def app_migrator_fix_app_field(context, site, module, app, dry_run):
     print(f"   Target App: {app}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    # Find DocTypes with NULL app field in this module
-    doctypes_with_null_app = frappe.db.sql("""
-        SELECT name, module, custom, app 
-        FROM `tabDocType` 
-        WHERE module = %s AND (app IS NULL OR app = '')
-    """, (module,), as_dict=True)
-    
-    if not doctypes_with_null_app:
-        print(f"\n✅ No DocTypes found with NULL app field in module '{module}'")
-        frappe.db.close()
-        return
-    
-    print(f"\n⚠️ DOCTYPES WITH NULL APP FIELD ({len(doctypes_with_null_app)}):")
-    for dt in doctypes_with_null_app:
-        print(f"   • {dt['name']} (custom={dt['custom']}, app={dt['app']})")
-    
-    if not dry_run:
-        print(f"\n🔧 FIXING APP FIELD...")
-        fixed_count = 0
+    with frappe_site(site):
+        # Find DocTypes with NULL app field in this module
+        doctypes_with_null_app = frappe.db.sql("""
+            SELECT name, module, custom, app 
+            FROM `tabDocType` 
+            WHERE module = %s AND (app IS NULL OR app = '')
+        """, (module,), as_dict=True)
+        
+        if not doctypes_with_null_app:
+            print(f"\n✅ No DocTypes found with NULL app field in module '{module}'")
+            return
+        
+        print(f"\n⚠️ DOCTYPES WITH NULL APP FIELD ({len(doctypes_with_null_app)}):")
         for dt in doctypes_with_null_app:
-            try:
-                frappe.db.set_value("DocType", dt['name'], "app", app, update_modified=False)
-                print(f"   ✅ {dt['name']} → app: {app}")
-                fixed_count += 1
-            except Exception as e:
-                print(f"   ❌ {dt['name']}: {e}")
+            print(f"   • {dt['name']} (custom={dt['custom']}, app={dt['app']})")
         
-        frappe.db.commit()
-        print(f"\n✅ Fixed {fixed_count}/{len(doctypes_with_null_app)} DocTypes")
-        print(f"\n📋 Now run: bench --site {site} migrate")
-    else:
-        print(f"\n📋 Run with --apply to fix the app field")
-    
-    frappe.db.close()
+        if not dry_run:
+            print(f"\n🔧 FIXING APP FIELD...")
+            # Same predicate as the preview, so it updates exactly the rows listed above
+            frappe.db.sql("""
+                UPDATE `tabDocType` SET app = %s
+                WHERE module = %s AND (app IS NULL OR app = '')
+            """, (app, module))
+            frappe.db.commit()
+            invalidate_doctype_cache()
+            print(f"\n✅ Fixed {len(doctypes_with_null_app)} DocTypes → app: {app}")
+            print(f"\n📋 Now run: bench --site {site} migrate")
+        else:
+            print(f"\n📋 Run with --apply to fix the app field")
 
 
 # ==================== FIX APP FIELD IN JSON FILES ====================
 
+def _write_fixed_json(update):
+    """Replace one JSON file atomically with its fixed bytes; returns (path, error) on failure"""
+    json_path, content = update
+    tmp_path = f"{json_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fp:
+            fp.write(content)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, json_path)
+    except Exception as e:
+        return json_path, str(e)
+
+_APP_NULL_RE = re.compile(r'"app":\s*null')
+# Duplicate "app" keys are only removed from the first 30 lines of the file
+_HEADER_LINES_RE = re.compile(r'(?:[^\n]*\n){0,30}')
+_APP_LINE_RE = re.compile(r'^[^\n]*"app":[^\n]*\n', re.MULTILINE)
+
 @click.command('app-migrator-fix-json-app')
 @click.argument('app_name')
 @click.option('--dry-run/--apply', default=True, help='Dry run or apply')
@@ -1432,9 +1835,6 @@ def app_migrator_fix_json_app(app_name, dry_run):
     Example:
         bench app-migrator-fix-json-app amb_w_tds --apply
     """
-    import os
-    import re
-    
     mode = "DRY-RUN" if dry_run else "APPLY"
     print(f"🔧 FIX JSON APP FIELD [{mode}]")
     print(f"   App: {app_name}")
@@ -1454,58 +1854,51 @@ def app_migrator_fix_json_app(app_name, dry_run):
     duplicate_app_files = []
     already_correct = []
     errors = []
+    updates = []  # (path, fixed bytes), written after the scan
     
-    for root, dirs, files in os.walk(app_path):
-        if "/doctype/" in root:
-            for f in files:
-                if f.endswith(".json") and not f.startswith("_"):
-                    json_path = os.path.join(root, f)
-                    try:
-                        with open(json_path, 'r') as fp:
-                            content = fp.read()
-                        
-                        # Check if this is a DocType JSON
-                        if '"doctype": "DocType"' not in content:
-                            continue
-                        
-                        needs_fix = False
-                        
-                        # Issue 1: Check for "app": null
-                        if '"app": null' in content or '"app":null' in content:
-                            null_app_files.append(json_path)
-                            needs_fix = True
-                            if not dry_run:
-                                content = re.sub(
-                                    r'"app":\s*null',
-                                    f'"app": "{app_name}"',
-                                    content
-                                )
-                        
-                        # Issue 2: Check for duplicate "app" fields
-                        app_count = len(re.findall(r'"app":', content))
-                        if app_count > 1:
-                            duplicate_app_files.append(json_path)
-                            needs_fix = True
-                            if not dry_run:
-                                # Remove the first occurrence (in first 30 lines)
-                                lines = content.split('\n')
-                                new_lines = []
-                                removed = False
-                                for i, line in enumerate(lines):
-                                    if not removed and i < 30 and '"app":' in line:
-                                        removed = True
-                                        continue
-                                    new_lines.append(line)
-                                content = '\n'.join(new_lines)
-                        
-                        if needs_fix and not dry_run:
-                            with open(json_path, 'w') as fp:
-                                fp.write(content)
-                        elif not needs_fix:
-                            already_correct.append(json_path)
-                            
-                    except Exception as e:
-                        errors.append((json_path, str(e)))
+    for json_path in iter_doctype_json_files(app_path):
+        try:
+            with open(json_path, 'rb') as fp:
+                raw = fp.read()
+            
+            # Check if this is a DocType JSON
+            if b'"doctype": "DocType"' not in raw:
+                continue
+            
+            # Most files have a single non-null "app"; settle those on the raw bytes
+            has_null_app = b'"app": null' in raw or b'"app":null' in raw
+            has_duplicate_app = raw.count(b'"app":') > 1
+            if not (has_null_app or has_duplicate_app):
+                already_correct.append(json_path)
+                continue
+            
+            content = raw.decode()
+            
+            # Issue 1: Check for "app": null
+            if has_null_app:
+                null_app_files.append(json_path)
+                if not dry_run:
+                    content = _APP_NULL_RE.sub(f'"app": "{app_name}"', content)
+            
+            # Issue 2: Check for duplicate "app" fields
+            if has_duplicate_app:
+                duplicate_app_files.append(json_path)
+                if not dry_run:
+                    # Remove the first occurrence (in first 30 lines)
+                    head_end = _HEADER_LINES_RE.match(content).end()
+                    content = _APP_LINE_RE.sub('', content[:head_end], count=1) + content[head_end:]
+            
+            if not dry_run:
+                updates.append((json_path, content.encode()))
+            
+        except Exception as e:
+            errors.append((json_path, str(e)))
+    
+    if updates:
+        # Small independent file writes, run them concurrently
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            errors.extend(error for error in executor.map(_write_fixed_json, updates) if error)
     
     print(f"\n📊 SCAN RESULTS:")
     print(f"   Files with 'app': null: {len(null_app_files)}")
@@ -1577,7 +1970,7 @@ def app_migrator_resolve_duplicates(keep, remove_from, add_dependency, dry_run):
     print("=" * 60)
     
     # Find apps path
-    apps_path = os.path.expanduser("~/frappe-bench/apps")
+    apps_path = APPS_DIR
     keep_app_path = os.path.join(apps_path, keep)
     remove_app_path = os.path.join(apps_path, remove_from)
     
@@ -1591,25 +1984,21 @@ def app_migrator_resolve_duplicates(keep, remove_from, add_dependency, dry_run):
     # Find all doctypes in both apps
     def get_doctypes(app_path, app_name):
         doctypes = {}
-        for root, dirs, files in os.walk(app_path):
-            if '/doctype/' in root or '\\doctype\\' in root:
-                for f in files:
-                    if f.endswith('.json') and not f.startswith('_'):
-                        json_path = os.path.join(root, f)
-                        try:
-                            with open(json_path) as jf:
-                                data = json.load(jf)
-                                if data.get('doctype') == 'DocType':
-                                    dt_name = data.get('name')
-                                    if dt_name:
-                                        doctypes[dt_name] = {
-                                            'path': os.path.dirname(json_path),
-                                            'app': data.get('app'),
-                                            'custom': data.get('custom', 0),
-                                            'fields': len(data.get('fields', []))
-                                        }
-                        except:
-                            pass
+        for json_path in iter_doctype_json_files(app_path):
+            try:
+                with open(json_path) as jf:
+                    data = json.load(jf)
+                    if data.get('doctype') == 'DocType':
+                        dt_name = data.get('name')
+                        if dt_name:
+                            doctypes[dt_name] = {
+                                'path': os.path.dirname(json_path),
+                                'app': data.get('app'),
+                                'custom': data.get('custom', 0),
+                                'fields': len(data.get('fields', []))
+                            }
+            except:
+                pass
         return doctypes
     
     keep_doctypes = get_doctypes(keep_app_path, keep)
@@ -1664,7 +2053,6 @@ def app_migrator_resolve_duplicates(keep, remove_from, add_dependency, dry_run):
                     # Check if keep app is already in required_apps
                     if keep not in hooks_content:
                         # Add to existing required_apps
-                        import re
                         hooks_content = re.sub(
                             r'(required_apps\s*=\s*\[)',
                             f'\\1"{keep}", ',
@@ -1731,274 +2119,261 @@ def app_migrator_orphans(context, site, fix_mode, delete_mode, reassign, dry_run
     print(f"   Site: {site}")
     print("=" * 60)
     
-    frappe.init(site=site)
-    frappe.connect()
-    
-    # Get installed apps and their modules
-    installed_apps = frappe.get_installed_apps()
-    
-    # Build module-to-app mapping from Module Def
-    module_to_app = {}
-    module_defs = frappe.get_all("Module Def", fields=["name", "app_name"])
-    for md in module_defs:
-        if md.app_name:
-            module_to_app[md.name] = md.app_name
-    
-    # Scan filesystem for DocType definitions
-    apps_path = os.path.dirname(os.path.dirname(frappe.get_app_path('frappe')))
-    filesystem_doctypes = {}  # dt_name -> app_name
-    
-    for app_name in os.listdir(apps_path):
-        app_dir = os.path.join(apps_path, app_name)
-        if not os.path.isdir(app_dir) or app_name.startswith('.'):
-            continue
+    with frappe_site(site):
+        # Get installed apps and their modules
+        installed_apps = get_installed_apps()
         
-        for root, dirs, files in os.walk(app_dir):
-            if '/doctype/' in root or '\\doctype\\' in root:
-                for f in files:
-                    if f.endswith('.json') and not f.startswith('_'):
-                        json_path = os.path.join(root, f)
-                        try:
-                            with open(json_path) as jf:
-                                data = json.load(jf)
-                                if data.get('doctype') == 'DocType':
-                                    dt_name = data.get('name')
-                                    dt_module = data.get('module')
-                                    if dt_name:
-                                        # Check if .py controller exists
-                                        dt_folder = os.path.dirname(json_path)
-                                        dt_folder_name = os.path.basename(dt_folder)
-                                        py_file = os.path.join(dt_folder, f"{dt_folder_name}.py")
-                                        has_controller = os.path.exists(py_file)
-                                        
-                                        filesystem_doctypes[dt_name] = {
-                                            'app': app_name,
-                                            'module': dt_module,
-                                            'path': json_path,
-                                            'py_path': py_file,
-                                            'has_controller': has_controller
-                                        }
-                        except:
-                            pass
-    
-    # Get all DocTypes from database
-    all_doctypes = frappe.get_all("DocType", 
-        fields=["name", "module", "app", "custom"],
-        filters={"custom": 0}  # Focus on standard DocTypes
-    )
-    
-    # Categorize orphans
-    orphans = {
-        'no_app_field': [],       # app field is NULL
-        'no_json': [],            # No JSON file in any app
-        'wrong_app': [],          # app field doesn't match filesystem
-        'no_controller': [],      # JSON exists but no .py controller file
-    }
-    
-    for dt in all_doctypes:
-        dt_name = dt.name
-        dt_module = dt.module
-        dt_app = dt.app
+        # Build module-to-app mapping from Module Def
+        module_to_app = {}
+        module_defs = frappe.get_all("Module Def", fields=["name", "app_name"])
+        for md in module_defs:
+            if md.app_name:
+                module_to_app[md.name] = md.app_name
+        
+        # Scan filesystem for DocType definitions
+        apps_path = os.path.dirname(os.path.dirname(frappe.get_app_path('frappe')))
+        filesystem_doctypes = {}  # dt_name -> app_name
+        
+        with os.scandir(apps_path) as entries:
+            app_entries = [e for e in entries if e.is_dir() and not e.name.startswith('.')]
+        for entry in app_entries:
+            app_name, app_dir = entry.name, entry.path
+            
+            for json_path in iter_doctype_json_files(app_dir):
+                try:
+                    with open(json_path) as jf:
+                        data = json.load(jf)
+                        if data.get('doctype') == 'DocType':
+                            dt_name = data.get('name')
+                            dt_module = data.get('module')
+                            if dt_name:
+                                # Check if .py controller exists
+                                dt_folder = os.path.dirname(json_path)
+                                dt_folder_name = os.path.basename(dt_folder)
+                                py_file = os.path.join(dt_folder, f"{dt_folder_name}.py")
+                                has_controller = os.path.exists(py_file)
+                                            
+                                filesystem_doctypes[dt_name] = {
+                                    'app': app_name,
+                                    'module': dt_module,
+                                    'path': json_path,
+                                    'py_path': py_file,
+                                    'has_controller': has_controller
+                                }
+                except:
+                    pass
         
-        fs_info = filesystem_doctypes.get(dt_name)
+        # Get all DocTypes from database
+        all_doctypes = frappe.get_all("DocType", 
+            fields=["name", "module", "app", "custom"],
+            filters={"custom": 0}  # Focus on standard DocTypes
+        )
+        
+        # Categorize orphans
+        orphans = {
+            'no_app_field': [],       # app field is NULL
+            'no_json': [],            # No JSON file in any app
+            'wrong_app': [],          # app field doesn't match filesystem
+            'no_controller': [],      # JSON exists but no .py controller file
+        }
         
-        # Check 1: No app field
-        if not dt_app:
-            if fs_info:
-                orphans['no_app_field'].append({
+        for dt in all_doctypes:
+            dt_name = dt.name
+            dt_module = dt.module
+            dt_app = dt.app
+            
+            fs_info = filesystem_doctypes.get(dt_name)
+            
+            # Check 1: No app field
+            if not dt_app:
+                if fs_info:
+                    orphans['no_app_field'].append({
+                        'name': dt_name,
+                        'module': dt_module,
+                        'suggested_app': fs_info['app'],
+                        'suggested_module': fs_info['module']
+                    })
+                else:
+                    orphans['no_json'].append({
+                        'name': dt_name,
+                        'module': dt_module,
+                        'app': dt_app
+                    })
+                continue
+            
+            # Check 2: No JSON in filesystem
+            if not fs_info:
+                # Only flag if not in installed apps (could be core Frappe/ERPNext)
+                if dt_app not in installed_apps:
+                    orphans['no_json'].append({
+                        'name': dt_name,
+                        'module': dt_module,
+                        'app': dt_app
+                    })
+                continue
+            
+            # Check 3: App mismatch
+            if dt_app != fs_info['app']:
+                orphans['wrong_app'].append({
                     'name': dt_name,
-                    'module': dt_module,
-                    'suggested_app': fs_info['app'],
-                    'suggested_module': fs_info['module']
+                    'current_app': dt_app,
+                    'correct_app': fs_info['app'],
+                    'module': dt_module
                 })
-            else:
-                orphans['no_json'].append({
+            
+            # Check 4: Missing controller file (THE KEY CHECK!)
+            if not fs_info.get('has_controller'):
+                orphans['no_controller'].append({
                     'name': dt_name,
-                    'module': dt_module,
-                    'app': dt_app
+                    'app': fs_info['app'],
+                    'module': fs_info['module'],
+                    'py_path': fs_info['py_path']
                 })
-            continue
         
-        # Check 2: No JSON in filesystem
-        if not fs_info:
-            # Only flag if not in installed apps (could be core Frappe/ERPNext)
-            if dt_app not in installed_apps:
-                orphans['no_json'].append({
-                    'name': dt_name,
-                    'module': dt_module,
-                    'app': dt_app
-                })
-            continue
+        # Summary
+        total_orphans = sum(len(v) for v in orphans.values())
         
-        # Check 3: App mismatch
-        if dt_app != fs_info['app']:
-            orphans['wrong_app'].append({
-                'name': dt_name,
-                'current_app': dt_app,
-                'correct_app': fs_info['app'],
-                'module': dt_module
-            })
+        print(f"\n📊 ORPHAN ANALYSIS:")
+        print(f"   Total DocTypes scanned: {len(all_doctypes)}")
+        print(f"   Filesystem DocTypes found: {len(filesystem_doctypes)}")
+        print(f"   Total orphans: {total_orphans}")
+        print()
+        print(f"   📌 No 'app' field (fixable): {len(orphans['no_app_field'])}")
+        print(f"   📌 Wrong 'app' field: {len(orphans['wrong_app'])}")
+        print(f"   🔴 Missing .py controller (WILL ORPHAN!): {len(orphans['no_controller'])}")
+        print(f"   ⚠️  No JSON definition: {len(orphans['no_json'])}")
         
-        # Check 4: Missing controller file (THE KEY CHECK!)
-        if not fs_info.get('has_controller'):
-            orphans['no_controller'].append({
-                'name': dt_name,
-                'app': fs_info['app'],
-                'module': fs_info['module'],
-                'py_path': fs_info['py_path']
-            })
-    
-    # Summary
-    total_orphans = sum(len(v) for v in orphans.values())
-    
-    print(f"\n📊 ORPHAN ANALYSIS:")
-    print(f"   Total DocTypes scanned: {len(all_doctypes)}")
-    print(f"   Filesystem DocTypes found: {len(filesystem_doctypes)}")
-    print(f"   Total orphans: {total_orphans}")
-    print()
-    print(f"   📌 No 'app' field (fixable): {len(orphans['no_app_field'])}")
-    print(f"   📌 Wrong 'app' field: {len(orphans['wrong_app'])}")
-    print(f"   🔴 Missing .py controller (WILL ORPHAN!): {len(orphans['no_controller'])}")
-    print(f"   ⚠️  No JSON definition: {len(orphans['no_json'])}")
-    
-    # Show details
-    if orphans['no_app_field']:
-        print(f"\n🔧 DOCTYPES WITH NULL APP FIELD:")
-        for o in orphans['no_app_field'][:10]:
-            print(f"   • {o['name']:<40} → suggested: {o['suggested_app']}")
-        if len(orphans['no_app_field']) > 10:
-            print(f"   ... and {len(orphans['no_app_field']) - 10} more")
-    
-    if orphans['wrong_app']:
-        print(f"\n⚠️ DOCTYPES WITH WRONG APP FIELD:")
-        for o in orphans['wrong_app'][:10]:
-            print(f"   • {o['name']:<40} current: {o['current_app']}, should be: {o['correct_app']}")
-        if len(orphans['wrong_app']) > 10:
-            print(f"   ... and {len(orphans['wrong_app']) - 10} more")
-    
-    if orphans['no_controller']:
-        print(f"\n🔴 DOCTYPES WITH MISSING .PY CONTROLLER (will be deleted by migrate!):")
-        for o in orphans['no_controller'][:15]:
-            print(f"   • {o['name']:<40} app: {o['app']}, missing: {os.path.basename(o['py_path'])}")
-        if len(orphans['no_controller']) > 15:
-            print(f"   ... and {len(orphans['no_controller']) - 15} more")
-    
-    if orphans['no_json']:
-        print(f"\n❓ DOCTYPES WITH NO JSON (may be deletable):")
-        for o in orphans['no_json'][:10]:
-            print(f"   • {o['name']:<40} module: {o['module']}, app: {o['app']}")
-        if len(orphans['no_json']) > 10:
-            print(f"   ... and {len(orphans['no_json']) - 10} more")
-    
-    # Apply fixes
-    if not dry_run:
-        fixed_count = 0
-        deleted_count = 0
+        # Show details
+        if orphans['no_app_field']:
+            print(f"\n🔧 DOCTYPES WITH NULL APP FIELD:")
+            for o in orphans['no_app_field'][:10]:
+                print(f"   • {o['name']:<40} → suggested: {o['suggested_app']}")
+            if len(orphans['no_app_field']) > 10:
+                print(f"   ... and {len(orphans['no_app_field']) - 10} more")
         
-        if fix_mode:
-            print(f"\n🔧 APPLYING AUTO-FIX...")
-            
-            # Fix NULL app field
-            for o in orphans['no_app_field']:
-                try:
-                    frappe.db.set_value("DocType", o['name'], {
-                        'app': o['suggested_app'],
-                        'module': o['suggested_module']
-                    }, update_modified=False)
-                    print(f"   ✅ {o['name']} → app: {o['suggested_app']}")
-                    fixed_count += 1
-                except Exception as e:
-                    print(f"   ❌ {o['name']}: {e}")
-            
-            # Fix wrong app field
-            for o in orphans['wrong_app']:
-                try:
-                    frappe.db.set_value("DocType", o['name'], 'app', o['correct_app'], update_modified=False)
-                    print(f"   ✅ {o['name']} → app: {o['correct_app']}")
-                    fixed_count += 1
-                except Exception as e:
-                    print(f"   ❌ {o['name']}: {e}")
-            
-            frappe.db.commit()
+        if orphans['wrong_app']:
+            print(f"\n⚠️ DOCTYPES WITH WRONG APP FIELD:")
+            for o in orphans['wrong_app'][:10]:
+                print(f"   • {o['name']:<40} current: {o['current_app']}, should be: {o['correct_app']}")
+            if len(orphans['wrong_app']) > 10:
+                print(f"   ... and {len(orphans['wrong_app']) - 10} more")
+        
+        if orphans['no_controller']:
+            print(f"\n🔴 DOCTYPES WITH MISSING .PY CONTROLLER (will be deleted by migrate!):")
+            for o in orphans['no_controller'][:15]:
+                print(f"   • {o['name']:<40} app: {o['app']}, missing: {os.path.basename(o['py_path'])}")
+            if len(orphans['no_controller']) > 15:
+                print(f"   ... and {len(orphans['no_controller']) - 15} more")
+        
+        if orphans['no_json']:
+            print(f"\n❓ DOCTYPES WITH NO JSON (may be deletable):")
+            for o in orphans['no_json'][:10]:
+                print(f"   • {o['name']:<40} module: {o['module']}, app: {o['app']}")
+            if len(orphans['no_json']) > 10:
+                print(f"   ... and {len(orphans['no_json']) - 10} more")
+        
+        # Apply fixes
+        if not dry_run:
+            fixed_count = 0
+            deleted_count = 0
             
-            # Create missing controller files (THE KEY FIX!)
-            controllers_created = 0
-            if orphans['no_controller']:
-                print(f"\n🔧 CREATING MISSING CONTROLLER FILES...")
-                for o in orphans['no_controller']:
-                    py_path = o['py_path']
-                    dt_name = o['name']
-                    
-                    # Convert doctype name to class name (Title Case -> PascalCase)
-                    # e.g., "TDS Settings" -> "TdsSettings"
-                    class_name = ''.join(word.capitalize() for word in dt_name.replace('-', ' ').split())
-                    
-                    controller_content = f'''import frappe
-from frappe.model.document import Document
-
-
-class {class_name}(Document):
-    pass
-'''
+            if fix_mode:
+                print(f"\n🔧 APPLYING AUTO-FIX...")
+                
+                # Fix NULL app field
+                for o in orphans['no_app_field']:
                     try:
-                        with open(py_path, 'w') as f:
-                            f.write(controller_content)
-                        print(f"   ✅ Created: {py_path}")
-                        controllers_created += 1
+                        frappe.db.set_value("DocType", o['name'], {
+                            'app': o['suggested_app'],
+                            'module': o['suggested_module']
+                        }, update_modified=False)
+                        print(f"   ✅ {o['name']} → app: {o['suggested_app']}")
+                        fixed_count += 1
                     except Exception as e:
-                        print(f"   ❌ {dt_name}: {e}")
+                        print(f"   ❌ {o['name']}: {e}")
                 
-                print(f"\n✅ Created {controllers_created} controller files")
-            
-            print(f"\n✅ Fixed {fixed_count} DocTypes, created {controllers_created} controllers")
-        
-        elif reassign:
-            print(f"\n🔧 REASSIGNING TO: {reassign}...")
-            reassign_module = reassign.replace("_", " ").title()
-            
-            all_fixable = orphans['no_app_field'] + orphans['wrong_app']
-            for o in all_fixable:
-                try:
-                    frappe.db.set_value("DocType", o['name'], {
-                        'app': reassign,
-                        'module': reassign_module
-                    }, update_modified=False)
-                    print(f"   ✅ {o['name']} → {reassign}")
-                    fixed_count += 1
-                except Exception as e:
-                    print(f"   ❌ {o['name']}: {e}")
+                # Fix wrong app field
+                for o in orphans['wrong_app']:
+                    try:
+                        frappe.db.set_value("DocType", o['name'], 'app', o['correct_app'], update_modified=False)
+                        print(f"   ✅ {o['name']} → app: {o['correct_app']}")
+                        fixed_count += 1
+                    except Exception as e:
+                        print(f"   ❌ {o['name']}: {e}")
+                
+                frappe.db.commit()
+                invalidate_doctype_cache()
+                
+                # Create missing controller files (THE KEY FIX!)
+                controllers_created = 0
+                if orphans['no_controller']:
+                    print(f"\n🔧 CREATING MISSING CONTROLLER FILES...")
+                    for o in orphans['no_controller']:
+                        py_path = o['py_path']
+                        dt_name = o['name']
+                        
+                        # Convert doctype name to class name (Title Case -> PascalCase)
+                        # e.g., "TDS Settings" -> "TdsSettings"
+                        class_name = ''.join(word.capitalize() for word in dt_name.replace('-', ' ').split())
+                        
+                        try:
+                            with open(py_path, 'w') as f:
+                                f.write(CONTROLLER_TEMPLATE.format(class_name=class_name))
+                            print(f"   ✅ Created: {py_path}")
+                            controllers_created += 1
+                        except Exception as e:
+                            print(f"   ❌ {dt_name}: {e}")
+                    
+                    print(f"\n✅ Created {controllers_created} controller files")
+                
+                print(f"\n✅ Fixed {fixed_count} DocTypes, created {controllers_created} controllers")
             
-            frappe.db.commit()
-            print(f"\n✅ Reassigned {fixed_count} DocTypes to {reassign}")
-        
-        elif delete_mode:
-            if not click.confirm(f"⚠️ DELETE {len(orphans['no_json'])} orphaned DocTypes? This is IRREVERSIBLE!"):
-                print("❌ Cancelled")
-            else:
-                print(f"\n🗑️ DELETING ORPHANS...")
-                for o in orphans['no_json']:
+            elif reassign:
+                print(f"\n🔧 REASSIGNING TO: {reassign}...")
+                reassign_module = reassign.replace("_", " ").title()
+                
+                all_fixable = orphans['no_app_field'] + orphans['wrong_app']
+                for o in all_fixable:
                     try:
-                        frappe.delete_doc("DocType", o['name'], force=True)
-                        print(f"   🗑️ Deleted: {o['name']}")
-                        deleted_count += 1
+                        frappe.db.set_value("DocType", o['name'], {
+                            'app': reassign,
+                            'module': reassign_module
+                        }, update_modified=False)
+                        print(f"   ✅ {o['name']} → {reassign}")
+                        fixed_count += 1
                     except Exception as e:
                         print(f"   ❌ {o['name']}: {e}")
                 
                 frappe.db.commit()
-                print(f"\n✅ Deleted {deleted_count} orphaned DocTypes")
+                invalidate_doctype_cache()
+                print(f"\n✅ Reassigned {fixed_count} DocTypes to {reassign}")
+            
+            elif delete_mode:
+                if not click.confirm(f"⚠️ DELETE {len(orphans['no_json'])} orphaned DocTypes? This is IRREVERSIBLE!"):
+                    print("❌ Cancelled")
+                else:
+                    print(f"\n🗑️ DELETING ORPHANS...")
+                    for o in orphans['no_json']:
+                        try:
+                            frappe.delete_doc("DocType", o['name'], force=True)
+                            print(f"   🗑️ Deleted: {o['name']}")
+                            deleted_count += 1
+                        except Exception as e:
+                            print(f"   ❌ {o['name']}: {e}")
+                    
+                    frappe.db.commit()
+                    print(f"\n✅ Deleted {deleted_count} orphaned DocTypes")
+            
+            print(f"\n📋 Now run: bench --site {site} migrate")
         
-        print(f"\n📋 Now run: bench --site {site} migrate")
-    
-    else:
-        if total_orphans > 0:
-            print(f"\n📋 RESOLUTION OPTIONS:")
-            print(f"   bench app-migrator orphans --site {site} --fix --apply")
-            print(f"   bench app-migrator orphans --site {site} --reassign <app_name> --apply")
-            print(f"   bench app-migrator orphans --site {site} --delete --apply")
         else:
-            print(f"\n✅ No orphaned DocTypes found!")
-    
-    frappe.db.close()
+            if total_orphans > 0:
+                print(f"\n📋 RESOLUTION OPTIONS:")
+                print(f"   bench app-migrator orphans --site {site} --fix --apply")
+                print(f"   bench app-migrator orphans --site {site} --reassign <app_name> --apply")
+                print(f"   bench app-migrator orphans --site {site} --delete --apply")
+            else:
+                print(f"\n✅ No orphaned DocTypes found!")
 
 
 # ==================== MAIN GROUP COMMAND ====================
@@ -2023,6 +2398,7 @@ SITE ANALYSIS:
   scan                Scan site inventory
   conflicts           Detect app conflicts
   apps                Downloaded vs installed apps
+  clear-cache         Remove DocType scan cache
 
 MIGRATION:
   plan                Generate migration plan
@@ -2064,7 +2440,6 @@ from .intelligence import predict_success, generate_intelligent_plan, diagnose_a
 from .modernize import modernize_app
 from .git_push import git_push
 from .git_pull import git_pull
-from .git_utils import get_app_info, FrappeCloudAPI, clone_app_from_git, convert_to_git_repo
 from .git_info import git_info
 from .api_key_manager import api_key_setup, api_key_status, api_key_cleanup
 from .setup.wizard import setup_wizard
@@ -2080,6 +2455,7 @@ from .simple_api_setup import simple_api_setup
 # Add subcommands to the group
 app_migrator.add_command(app_migrator_health, 'health')
 app_migrator.add_command(app_migrator_scan, 'scan')
+app_migrator.add_command(app_migrator_clear_cache, 'clear-cache')
 app_migrator.add_command(app_migrator_conflicts, 'conflicts')
 app_migrator.add_command(app_migrator_plan, 'plan')
 app_migrator.add_command(app_migrator_execute, 'execute')
@@ -2112,7 +2488,6 @@ app_migrator.add_command(predict_success, 'predict-success')
 app_migrator.add_command(generate_intelligent_plan, 'generate-plan')
 app_migrator.add_command(diagnose_app, 'diagnose')
 app_migrator.add_command(modernize_app, 'modernize')
-git_push,
 app_migrator.add_command(git_push, "git-push")
 app_migrator.add_command(git_pull, "git-pull")
 app_migrator.add_command(api_key_cleanup, "api-key-cleanup")
@@ -2128,6 +2503,7 @@ commands = [
     app_migrator,  # Main group command
     app_migrator_health,
     app_migrator_scan,
+    app_migrator_clear_cache,
     app_migrator_conflicts,
     app_migrator_plan,
     app_migrator_execute,
@@ -2154,13 +2530,3 @@ commands = [
     
     setup_wizard
     ]
-
-print("✅ App Migrator Enterprise v9.0.0 ready!")
-
-# Git push command
-
-# Analyze commands
-from app_migrator.commands.analyze.apps import analyze_apps
-
-# Simple commands
-from app_migrator.commands.simple_api_setup import simple_api_setup, quick_setup
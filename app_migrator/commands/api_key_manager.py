@@ -8,7 +8,6 @@ import json
 import getpass
 from pathlib import Path
 from typing import Optional, Dict, Any
-import keyring
 import hashlib
 import base64
 from datetime import datetime, timedelta
@@ -100,6 +99,7 @@ class APISessionManager:
         # Store in keyring if requested
         if keep_secret:
             try:
+                import keyring  # loads its backends on import, so only when needed
                 keyring.set_password(self.SERVICE_NAME, "frappe_cloud_api_key", api_key)
                 session_data['keyring_stored'] = True
                 click.echo("✅ API key securely stored in system keyring")
@@ -148,6 +148,7 @@ class APISessionManager:
                 # Try to get from keyring
                 if session_data.get('keyring_stored'):
                     try:
+                        import keyring
                         api_key = keyring.get_password(self.SERVICE_NAME, "frappe_cloud_api_key")
                         if api_key and self._verify_key(api_key, session_data['api_key_hash']):
                             hours_left = (expires_at - datetime.now()).total_seconds() / 3600
@@ -184,6 +185,7 @@ class APISessionManager:
             
             # Remove from keyring
             if clear_keyring:
+                import keyring
                 try:
                     keyring.delete_password(self.SERVICE_NAME, "frappe_cloud_api_key")
                     click.echo("✅ API key removed from keyring")
@@ -421,6 +423,7 @@ def api_key_status(verbose=False):
         
         # Test keyring access
         try:
+            import keyring
             test_key = keyring.get_password(manager.SERVICE_NAME, "frappe_cloud_api_key")
             if test_key:
                 click.echo("  Keyring test: ✅ Accessible")
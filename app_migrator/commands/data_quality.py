@@ -382,7 +382,7 @@ def fix_all_references(target_app):
         
         for source_dt in all_doctypes:
             try:
-                doc = frappe.get_doc('DocType', source_dt['name'])
+                doc = frappe.get_cached_doc('DocType', source_dt['name'])
                 doc_references = []
                 
                 # Check all fields
@@ -31,7 +31,7 @@ def get_doctype_classification(doctype_name):
     """
     try:
         # Get DocType record
-        doctype_doc = frappe.get_doc("DocType", doctype_name)
+        doctype_doc = frappe.get_cached_doc("DocType", doctype_name)
         
         classification = {
             "name": doctype_name,
@@ -3,7 +3,6 @@ Git Utilities for Frappe Apps - Integration with Frappe Cloud API
 """
 
 import os
-import requests
 import json
 from pathlib import Path
 from typing import Optional, Dict, List
@@ -24,6 +23,7 @@ class FrappeCloudAPI:
             return None
             
         try:
+            import requests
             headers = {
                 'Authorization': f'token {self.api_key}',
                 'Content-Type': 'application/json'
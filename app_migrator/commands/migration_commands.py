@@ -11,13 +11,10 @@ Implements the core migration workflow commands:
 import os
 import sys
 import json
-import yaml
 import click
-from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional
 from collections import defaultdict
-import hashlib
 
 try:
     import frappe
@@ -100,7 +97,9 @@ def scan_site_impl(site_name: str, apps_filter: Optional[List[str]] = None) -> S
         all_doctypes = frappe.get_all(
             "DocType",
             filters=doctype_filters,
-            fields=["name", "module", "custom", "istable", "issingle", "is_virtual"]
+            fields=["name", "module", "custom", "istable", "issingle", "is_virtual"],
+            limit_page_length=0,
+            order_by="name"
         )
         
         for dt in all_doctypes:
@@ -126,34 +125,32 @@ def scan_site_impl(site_name: str, apps_filter: Optional[List[str]] = None) -> S
             else:
                 result.doctypes.append(dt_info)
         
+        # Doctypes of the filtered apps scope custom fields and property setters
+        app_doctypes = [dt["name"] for dt in all_doctypes] if apps_filter else []
+        
         # Get Custom Fields
         cf_filters = {}
-        if apps_filter:
-            # Get doctypes for these apps first, then filter custom fields
-            app_doctypes = [dt["name"] for dt in all_doctypes]
-            if app_doctypes:
-                cf_filters["dt"] = ["in", app_doctypes]
+        if app_doctypes:
+            cf_filters["dt"] = ["in", app_doctypes]
         
         custom_fields = frappe.get_all(
             "Custom Field",
             filters=cf_filters,
             fields=["name", "dt", "fieldname", "fieldtype", "label", "options"]
         )
-        result.custom_fields = [dict(cf) for cf in custom_fields]
+        result.custom_fields = custom_fields
         
         # Get Property Setters
         ps_filters = {}
-        if apps_filter:
-            app_doctypes = [dt["name"] for dt in all_doctypes]
-            if app_doctypes:
-                ps_filters["doc_type"] = ["in", app_doctypes]
+        if app_doctypes:
+            ps_filters["doc_type"] = ["in", app_doctypes]
         
         property_setters = frappe.get_all(
             "Property Setter",
             filters=ps_filters,
             fields=["name", "doc_type", "field_name", "property", "value", "property_type"]
         )
-        result.property_setters = [dict(ps) for ps in property_setters]
+        result.property_setters = property_setters
         
         # Get total tables count
         tables = frappe.db.sql("SHOW TABLES", as_dict=True)
@@ -198,6 +195,7 @@ def scan_site(context, site, apps, output, output_format):
         if output:
             with open(output, 'w') as f:
                 if output_format == 'yaml':
+                    import yaml
                     yaml.dump(result_dict, f, default_flow_style=False)
                 else:
                     json.dump(result_dict, f, indent=2)
@@ -294,34 +292,44 @@ def detect_conflicts_impl(site_name: str, apps: List[str]) -> ConflictDetectionR
     result = ConflictDetectionResult(site_name, apps)
     
     try:
-        # Get all doctypes for the specified apps
-        app_doctypes = {}
-        for app in apps:
-            doctypes = frappe.get_all(
-                "DocType",
-                filters={"module": app},
-                fields=["name", "module", "custom"]
-            )
-            app_doctypes[app] = [dt.name for dt in doctypes]
+        if frappe.db.db_type != "mariadb":
+            # GROUP_CONCAT/IFNULL below are MariaDB-only; group in Python instead
+            doctype_to_apps = defaultdict(set)
+            if apps:
+                for dt in frappe.get_all("DocType", filters={"module": ["in", list(apps)]},
+                        fields=["name", "module"], limit_page_length=0, order_by="name"):
+                    doctype_to_apps[dt.name].add(dt.module)
+            orphan_doctypes = frappe.get_all("DocType",
+                filters=[["module", "in", ["", "None", None]], ["custom", "=", 0]],
+                fields=["name", "module"], limit_page_length=0, order_by="name")
+        else:
+            # Group doctypes by owning app in the database (one row per doctype) and
+            # pick out orphans (no module, not custom) in the same round trip
+            rows = frappe.db.sql("""
+                SELECT 'app' AS kind, name, GROUP_CONCAT(DISTINCT module) AS module
+                FROM `tabDocType`
+                WHERE module IN %(apps)s
+                GROUP BY name
+                UNION ALL
+                SELECT 'orphan', name, module
+                FROM `tabDocType`
+                WHERE IFNULL(module, '') IN ('', 'None') AND custom = 0
+                ORDER BY name
+            """, {"apps": tuple(apps) or (None,)}, as_dict=True)
+            doctype_to_apps = {row.name: set(row.module.split(",")) for row in rows if row.kind == "app"}
+            orphan_doctypes = [row for row in rows if row.kind == "orphan"]
         
         # Detect duplicate doctypes across apps
-        all_doctypes = []
-        doctype_to_apps = defaultdict(list)
-        for app, doctypes in app_doctypes.items():
-            for dt in doctypes:
-                doctype_to_apps[dt].append(app)
-                all_doctypes.append(dt)
-        
         for dt, dt_apps in doctype_to_apps.items():
             if len(dt_apps) > 1:
                 result.duplicate_doctypes.append({
                     "doctype": dt,
-                    "found_in_apps": dt_apps,
+                    "found_in_apps": sorted(dt_apps),
                     "resolution": "Choose which app should own this doctype"
                 })
         
         # Detect field clashes (same field name in linked doctypes with different types)
-        unique_doctypes = list(set(all_doctypes))
+        unique_doctypes = list(doctype_to_apps)
         if unique_doctypes:
             # Get all fields for these doctypes
             fields_data = frappe.db.sql("""
@@ -355,15 +363,6 @@ def detect_conflicts_impl(site_name: str, apps: List[str]) -> ConflictDetectionR
                         })
         
         # Detect orphan doctypes (app=None or module not found)
-        orphan_doctypes = frappe.get_all(
-            "DocType",
-            filters=[
-                ["module", "in", ["", None, "None"]],
-                ["custom", "=", 0]
-            ],
-            fields=["name", "module"]
-        )
-        
         for dt in orphan_doctypes:
             result.orphan_doctypes.append({
                 "doctype": dt.name,
@@ -374,7 +373,7 @@ def detect_conflicts_impl(site_name: str, apps: List[str]) -> ConflictDetectionR
         
         # Detect naming conflicts (similar names that might cause confusion)
         from difflib import SequenceMatcher
-        doctype_names = list(set(all_doctypes))
+        doctype_names = unique_doctypes
         for i, dt1 in enumerate(doctype_names):
             for dt2 in doctype_names[i+1:]:
                 similarity = SequenceMatcher(None, dt1.lower(), dt2.lower()).ratio()
@@ -453,6 +452,7 @@ def detect_conflicts(context, site, apps, output, output_format):
         if output:
             with open(output, 'w') as f:
                 if output_format == 'yaml':
+                    import yaml
                     yaml.dump(result_dict, f, default_flow_style=False)
                 else:
                     json.dump(result_dict, f, indent=2)
@@ -553,7 +553,9 @@ def generate_plan_impl(
             doctypes = frappe.get_all(
                 "DocType",
                 filters={"module": app},
-                fields=["name", "module", "custom", "istable"]
+                fields=["name", "module", "custom", "istable"],
+                limit_page_length=0,
+                order_by="name"
             )
             for dt in doctypes:
                 if dt.name not in ignored_doctypes:
@@ -624,15 +626,12 @@ def generate_plan_impl(
             
             plan.field_mappings.append(field_mapping)
         
-        # Generate data migration rules
+        # Generate data migration rules (record counts fetched in one round trip)
+        from app_migrator.commands import get_doctype_record_counts
+        counts = get_doctype_record_counts([m["doctype"] for m in plan.doctype_mappings])
         for mapping in plan.doctype_mappings:
             dt_name = mapping["doctype"]
-            
-            # Get record count
-            try:
-                count = frappe.db.count(dt_name)
-            except:
-                count = 0
+            count = counts[dt_name]
             
             data_rule = {
                 "doctype": dt_name,
@@ -725,6 +724,7 @@ def generate_plan(context, site, apps, target, config_file, output, output_forma
         if config_file and os.path.exists(config_file):
             with open(config_file, 'r') as f:
                 if config_file.endswith('.yaml') or config_file.endswith('.yml'):
+                    import yaml
                     config = yaml.safe_load(f)
                 else:
                     config = json.load(f)
@@ -739,6 +739,7 @@ def generate_plan(context, site, apps, target, config_file, output, output_forma
         # Save plan
         with open(output, 'w') as f:
             if output_format == 'yaml':
+                import yaml
                 yaml.dump(plan_dict, f, default_flow_style=False)
             else:
                 json.dump(plan_dict, f, indent=2)
@@ -891,6 +892,8 @@ def execute_plan_impl(
         # Commit if not dry run
         if not dry_run:
             frappe.db.commit()
+            from app_migrator.commands import invalidate_doctype_cache
+            invalidate_doctype_cache()
             click.echo("\n✅ Changes committed to database")
         
         # Run bench migrate if not dry run
@@ -949,6 +952,7 @@ def execute_plan(context, site, plan_file, dry_run, batch_size, output):
         # Load plan
         with open(plan_file, 'r') as f:
             if plan_file.endswith('.yaml') or plan_file.endswith('.yml'):
+                import yaml
                 plan = yaml.safe_load(f)
             else:
                 plan = json.load(f)
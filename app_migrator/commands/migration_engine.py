@@ -104,8 +104,8 @@ def monitor_directory_creation(app_name, timeout=600, check_interval=5):
         if os.path.exists(target_path):
             try:
                 result = subprocess.run(
-                    f"du -sh {target_path}",
-                    shell=True, capture_output=True, text=True
+                    ["du", "-sh", target_path],
+                    capture_output=True, text=True
                 )
                 size = result.stdout.strip().split()[0]
             except:
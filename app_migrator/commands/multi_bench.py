@@ -35,19 +35,20 @@ def compare_benches(bench1, bench2):
 
 def get_bench_apps_simple(bench_path):
     """Simple bench apps getter without complex output"""
+    apps_file = os.path.join(bench_path, "sites", "apps.txt")
     try:
-        result = subprocess.run(
-            f"cd {bench_path} && bench version",
-            shell=True, capture_output=True, text=True, timeout=30
-        )
-        lines = result.stdout.strip().split('\n')
-        apps = []
-        for line in lines:
-            if ' ' in line and not line.startswith('✅'):
-                app = line.split()[0]
-                apps.append(app)
-        return sorted(apps)
-    except:
+        with open(apps_file) as f:
+            return sorted(f.read().split())
+    except OSError:
+        pass
+    
+    # No apps.txt: fall back to app directories that carry a hooks.py
+    try:
+        with os.scandir(os.path.join(bench_path, "apps")) as entries:
+            return sorted(e.name for e in entries if e.is_dir() and (
+                os.path.exists(os.path.join(e.path, e.name, "hooks.py")) or
+                os.path.exists(os.path.join(e.path, "hooks.py"))))
+    except OSError:
         return []
 
 def bench_health_check():
@@ -77,7 +78,7 @@ def detect_available_benches_simple():
 def get_bench_size_simple(bench_path):
     """Simple size getter"""
     try:
-        result = subprocess.run(f"du -sh {bench_path}", shell=True, capture_output=True, text=True)
+        result = subprocess.run(["du", "-sh", bench_path], capture_output=True, text=True)
         return result.stdout.strip().split()[0]
     except:
         return "unknown"
@@ -4,7 +4,6 @@ import sys
 from pathlib import Path
 import subprocess
 import json
-import requests
 from datetime import datetime
 
 @click.command()
@@ -11,5 +11,3 @@ def get_fixtures():
         # "Migration Profile", 
         # "App Migration Log"
     ]
-
-print("✓ Fixtures module loaded")
@@ -17,5 +17,3 @@ def get_events():
         #     "app_migrator.tasks.weekly_report"
         # ]
     }
-
-print("✓ Scheduler events module loaded")